@@ -0,0 +1,81 @@
+import os
+import glob
+from pathlib import Path
+
+DEFAULT_ARCHIVE_DIR = str(Path.home() / "Videos" / "TeleStream")
+
+DEFAULT_ARCHIVE = {
+    "enabled": False,
+    "directory": "",
+    "segment_minutes": 10,
+    "quota_gb": 20
+}
+
+SEGMENT_PREFIX = "telestream-"
+SEGMENT_EXT = ".ts"
+
+
+def _escape_tee(text: str) -> str:
+    """Escapa os caracteres especiais da sintaxe do muxer tee."""
+    for char in ("\\", "|", "[", "]"):
+        text = text.replace(char, "\\" + char)
+    return text
+
+
+def tee_output(rtmp_url: str, directory: str, segment_minutes: int) -> str:
+    """Monta o destino do muxer tee: RTMP + segmentos locais do mesmo encode.
+
+    Uma falha ao gravar o arquivo não interrompe a transmissão.
+    """
+    pattern = Path(directory).as_posix() + f"/{SEGMENT_PREFIX}%Y%m%d-%H%M%S{SEGMENT_EXT}"
+    segment_options = ":".join([
+        "f=segment",
+        "segment_format=mpegts",
+        f"segment_time={segment_minutes * 60}",
+        "strftime=1",
+        "reset_timestamps=1",
+        "onfail=ignore",
+    ])
+    return f"[f=flv:onfail=abort]{_escape_tee(rtmp_url)}|[{segment_options}]{_escape_tee(pattern)}"
+
+
+def _segment_stats(directory: str) -> list:
+    """(mtime, tamanho, caminho) dos segmentos, do mais antigo ao mais recente.
+
+    Segmentos apagados entre a listagem e o stat são ignorados.
+    """
+    stats = []
+    for path in glob.glob(os.path.join(glob.escape(directory), f"{SEGMENT_PREFIX}*{SEGMENT_EXT}")):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        stats.append((stat.st_mtime, stat.st_size, path))
+    stats.sort()
+    return stats
+
+
+def prune(directory: str, quota_gb: float) -> list:
+    """Apaga os segmentos mais antigos até o arquivo caber na cota.
+
+    O segmento mais recente (em gravação) nunca é apagado.
+    Retorna os caminhos removidos.
+    """
+    quota_bytes = quota_gb * 1024 ** 3
+    segments = _segment_stats(directory)
+    total = sum(size for __, size, __ in segments)
+    removed = []
+    for __, size, path in segments[:-1]:
+        if total <= quota_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Already gone; it no longer counts against the quota
+            total -= size
+            continue
+        except OSError:
+            continue
+        total -= size
+        removed.append(path)
+    return removed
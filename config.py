@@ -1,29 +1,58 @@
 
+import os
+import copy
 import json
 from pathlib import Path
+from archive import DEFAULT_ARCHIVE
+from cpu_budget import DEFAULT_CPU_BUDGET
+from media_library import DEFAULT_LIBRARY
+from overlays import DEFAULT_OVERLAYS
+from preview import DEFAULT_PREVIEW
+from stall_watchdog import DEFAULT_WATCHDOG
+from youtube_cache import DEFAULT_YOUTUBE_CACHE
 
 CONFIG_FILE = Path("config.json")
 
 DEFAULT_CONFIG = {
     "favorites": [],
     "theme": "dark",
-    "live_story": False
+    "live_story": False,
+    "cpu_budget": DEFAULT_CPU_BUDGET,
+    "youtube_cache": DEFAULT_YOUTUBE_CACHE,
+    "archive": DEFAULT_ARCHIVE,
+    "renditions": [],
+    "watchdog": DEFAULT_WATCHDOG,
+    "overlays": DEFAULT_OVERLAYS,
+    "preview": DEFAULT_PREVIEW,
+    "library": DEFAULT_LIBRARY,
+    "schedules": [],
+    "resume_positions": {},
+    "trace_startup": False,
+    "stall_counts": {"sources": {}, "servers": {}}
 }
 
 def load_config() -> dict:
     """Carrega a configuração do arquivo config.json."""
     if not CONFIG_FILE.exists():
-        return DEFAULT_CONFIG.copy()
+        return copy.deepcopy(DEFAULT_CONFIG)
     try:
         with open(CONFIG_FILE, "r") as f:
             config = json.load(f)
-        merged_config = DEFAULT_CONFIG.copy()
+        merged_config = copy.deepcopy(DEFAULT_CONFIG)
         merged_config.update(config)
         return merged_config
     except json.JSONDecodeError:
-        return DEFAULT_CONFIG.copy()
+        return copy.deepcopy(DEFAULT_CONFIG)
 
 def save_config(config: dict) -> None:
-    """Salva a configuração no arquivo config.json."""
-    with open(CONFIG_FILE, "w") as f:
+    """Salva a configuração no arquivo config.json.
+
+    Grava em um arquivo temporário e o troca pelo original, então uma
+    queda no meio da gravação nunca deixa um config.json truncado.
+    """
+    partial = CONFIG_FILE.with_name(CONFIG_FILE.name + ".partial")
+    with open(partial, "w") as f:
         json.dump(config, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, CONFIG_FILE)
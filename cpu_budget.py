@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_CPU_BUDGET = {
+    "auto": False,
+    "threads": 0,
+    "filter_threads": 0,
+    "affinity": "",
+    "nice": 0
+}
+
+# Streams of every TeleStream instance of this user share one registry
+# file, so auto mode divides the cores among all of them
+REGISTRY_FILE = "cpu-streams.json"
+
+_lock = threading.Lock()
+_local_streams = {}  # used where file locking is unavailable
+_next_slot = 0
+
+
+def available_cores() -> list:
+    """Retorna os núcleos que este processo pode usar."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def parse_cpu_list(text: str) -> list:
+    """Converte uma lista no formato "0-3,6" em [0, 1, 2, 3, 6]."""
+    cores = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cores.update(range(int(start), int(end) + 1))
+        else:
+            cores.add(int(part))
+    return sorted(cores)
+
+
+def format_cpu_list(cores: list) -> str:
+    """Formata uma lista de núcleos de forma compacta ("0-3,6")."""
+    ranges = []
+    for core in sorted(cores):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def runtime_dir() -> str:
+    """Diretório do registro compartilhado (por usuário)."""
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "telestream")
+    suffix = f"-{os.getuid()}" if hasattr(os, "getuid") else ""
+    return os.path.join(tempfile.gettempdir(), f"telestream{suffix}")
+
+
+def process_alive(pid: int) -> bool:
+    """Indica se o processo existe. Sem como verificar (Windows), assume que sim."""
+    if os.name != "posix":
+        # os.kill(pid, 0) sends CTRL_C_EVENT on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _stream_alive(entry: dict) -> bool:
+    # Entries left behind by an instance that crashed or was killed
+    if not process_alive(entry["owner"]):
+        return False
+    return entry["pid"] is None or process_alive(entry["pid"])
+
+
+@contextmanager
+def _registry():
+    """Abre o registro de streams com trava exclusiva e o grava ao sair.
+
+    Sem fcntl (Windows) o registro vale só para este processo.
+    """
+    with _lock:
+        if fcntl is None:
+            yield _local_streams
+            return
+        path = os.path.join(runtime_dir(), REGISTRY_FILE)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock_file = open(path + ".lock", "a")
+        except OSError:
+            yield _local_streams
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(path, "r") as f:
+                    streams = json.load(f)
+            except (OSError, ValueError):
+                streams = {}
+            streams = {slot: entry for slot, entry in streams.items() if _stream_alive(entry)}
+            yield streams
+            partial = path + ".partial"
+            with open(partial, "w") as f:
+                json.dump(streams, f)
+            os.replace(partial, path)
+
+
+def acquire_slot(auto: bool = False) -> str:
+    """Registra um novo stream em execução e retorna seu slot."""
+    global _next_slot
+    with _lock:
+        slot = f"{os.getpid()}-{_next_slot}"
+        _next_slot += 1
+    with _registry() as streams:
+        streams[slot] = {"owner": os.getpid(), "pid": None, "auto": auto, "started": time.time()}
+    return slot
+
+
+def register_pid(slot: str, pid: int) -> None:
+    with _registry() as streams:
+        if slot in streams:
+            streams[slot]["pid"] = pid
+
+
+def release_slot(slot: str) -> None:
+    with _registry() as streams:
+        streams.pop(slot, None)
+
+
+def _auto_share(slot: str, streams: dict) -> list:
+    """Divide os núcleos disponíveis entre os streams em modo automático.
+
+    Streams com afinidade manual escolhem os próprios núcleos e não
+    entram na divisão.
+    """
+    cores = available_cores()
+    slots = sorted((s for s, entry in streams.items() if entry["auto"]),
+                   key=lambda s: (streams[s]["started"], s))
+    count = max(1, len(slots))
+    share = max(1, len(cores) // count)
+    position = slots.index(slot) if slot in slots else 0
+    start = (position * share) % len(cores)
+    return cores[start:start + share] or cores
+
+
+def set_affinity(pid: int, cores: list) -> None:
+    """Fixa todas as threads do processo nos núcleos.
+
+    No Linux sched_setaffinity(pid) altera só a thread principal; as
+    threads de codificação já criadas mantêm a máscara antiga.
+    """
+    task_dir = f"/proc/{pid}/task"
+    try:
+        tids = [int(tid) for tid in os.listdir(task_dir)]
+    except OSError:
+        tids = [pid]
+    for tid in tids:
+        try:
+            os.sched_setaffinity(tid, cores)
+        except ProcessLookupError:
+            # Thread exited in the meantime
+            continue
+
+
+def resolve_budget(budget: dict, slot: str) -> dict:
+    """Calcula threads, afinidade e prioridade efetivas para um stream."""
+    budget = {**DEFAULT_CPU_BUDGET, **(budget or {})}
+    if budget["auto"]:
+        with _registry() as streams:
+            cores = _auto_share(slot, streams)
+        return {
+            "threads": len(cores),
+            "filter_threads": len(cores),
+            "affinity": cores,
+            "nice": budget["nice"]
+        }
+    affinity = parse_cpu_list(budget["affinity"]) if budget["affinity"] else []
+    return {
+        "threads": budget["threads"],
+        "filter_threads": budget["filter_threads"],
+        "affinity": affinity,
+        "nice": budget["nice"]
+    }
+
+
+def ffmpeg_thread_args(resolved: dict) -> tuple:
+    """Retorna os argumentos globais e de saída do ffmpeg para o orçamento."""
+    global_args = []
+    output_args = []
+    if resolved["filter_threads"]:
+        global_args.extend([
+            "-filter_threads", str(resolved["filter_threads"]),
+            "-filter_complex_threads", str(resolved["filter_threads"]),
+        ])
+    if resolved["threads"]:
+        output_args.extend(["-threads", str(resolved["threads"])])
+    return global_args, output_args
+
+
+def apply_to_process(pid: int, resolved: dict) -> list:
+    """Aplica afinidade e prioridade a um processo. Retorna mensagens de log."""
+    messages = []
+    if resolved["affinity"]:
+        if hasattr(os, "sched_setaffinity"):
+            try:
+                set_affinity(pid, resolved["affinity"])
+                messages.append(f"CPU affinity set to cores {format_cpu_list(resolved['affinity'])}.")
+            except OSError as e:
+                messages.append(f"[WARNING] Failed to set CPU affinity: {e}")
+        else:
+            messages.append("[WARNING] CPU affinity is not supported on this platform.")
+    if resolved["nice"]:
+        if hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, pid, resolved["nice"])
+                messages.append(f"Process priority set to nice {resolved['nice']}.")
+            except OSError as e:
+                messages.append(f"[WARNING] Failed to set process priority: {e}")
+        else:
+            messages.append("[WARNING] Process priority is not supported on this platform.")
+    return messages
+
+
+def rebalance(budget: dict) -> list:
+    """Redistribui a afinidade dos streams em modo automático após uma mudança.
+
+    Vale para os streams de todas as instâncias; os de afinidade manual
+    não são alterados.
+    """
+    if not (budget or {}).get("auto") or not hasattr(os, "sched_setaffinity"):
+        return []
+    with _registry() as streams:
+        running = [(slot, entry["pid"], _auto_share(slot, streams))
+                   for slot, entry in streams.items() if entry["auto"] and entry["pid"]]
+    messages = []
+    for slot, pid, cores in running:
+        try:
+            set_affinity(pid, cores)
+        except OSError:
+            continue
+        messages.append(f"Rebalanced PID {pid} to cores {format_cpu_list(cores)}.")
+    return messages
@@ -1,21 +1,19 @@
 import io
-import os
-import sys
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QPushButton, QTextEdit, QMessageBox,
     QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView,
-    QLineEdit, QHBoxLayout, QGroupBox
+    QLineEdit, QHBoxLayout, QGroupBox, QComboBox, QListWidget, QFileDialog,
+    QCheckBox, QTimeEdit
 )
 from PyQt6.QtGui import QPixmap, QImage, QIcon
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, QSize, QTime, pyqtSignal
 import qrcode
+import resources
+from media_library import THUMBNAIL_WIDTH, format_duration
+from scheduler import DAY_NAMES
 
-def get_icon_path(theme_name, icon_name):
-    if getattr(sys, 'frozen', False):
-        base_path = sys._MEIPASS
-    else:
-        base_path = os.path.dirname(__file__)
-    return os.path.join(base_path, "themes", "icons", theme_name, icon_name)
+# Rendered PIX QR codes per theme, reused across dialog opens
+_qr_pixmaps = {}
 
 class AboutDialog(QDialog):
     def __init__(self, theme_name: str, parent=None):
@@ -56,7 +54,7 @@ class AboutDialog(QDialog):
         actions_group = QGroupBox("Actions")
         actions_layout = QHBoxLayout()
         actions_layout.setContentsMargins(10, 15, 10, 10)
-        self.back_button = QPushButton(QIcon(get_icon_path(self.theme_name, "go-previous.svg")), "Back")
+        self.back_button = QPushButton(resources.icon(self.theme_name, "go-previous.svg"), "Back")
         self.back_button.setToolTip("Return to the main window.")
         self.back_button.clicked.connect(self.accept)
         actions_layout.addWidget(self.back_button)
@@ -66,6 +64,14 @@ class AboutDialog(QDialog):
         self.setMinimumWidth(400)
 
     def generate_and_display_qr_code(self):
+        pixmap = _qr_pixmaps.get(self.theme_name)
+        if pixmap is None:
+            pixmap = self.generate_qr_pixmap()
+            _qr_pixmaps[self.theme_name] = pixmap
+        self.qr_label.setPixmap(pixmap)
+        self.qr_label.setFixedSize(pixmap.size())
+
+    def generate_qr_pixmap(self):
         pix_string = "00020126580014br.gov.bcb.pix0136aa97cd56-b793-4c39-94be-c190a29f40865204000053039865802BR5925JULIANO_DORNELES_DOS_SANT6012Santo_Angelo610998803-41762290525C7X00138965117602953262656304D7E8"
         fill = "#f0f0f0" if self.theme_name == "dark" else "black"
         back = "transparent" if self.theme_name == "dark" else "white"
@@ -79,14 +85,12 @@ class AboutDialog(QDialog):
         buffer = io.BytesIO()
         img.save(buffer, "PNG")
         qt_image = QImage.fromData(buffer.getvalue())
-        pixmap = QPixmap.fromImage(qt_image)
-        self.qr_label.setPixmap(pixmap)
-        self.qr_label.setFixedSize(pixmap.size())
+        return QPixmap.fromImage(qt_image)
 
 class LogDialog(QDialog):
     log_cleared = pyqtSignal()
 
-    def __init__(self, log_history, theme_name: str, parent=None):
+    def __init__(self, log_history, theme_name: str, parent=None, max_lines: int = 0):
         super().__init__(parent)
         self.setWindowTitle("Application Log")
         self.theme_name = theme_name
@@ -99,6 +103,7 @@ class LogDialog(QDialog):
         self.log_viewer = QTextEdit()
         self.log_viewer.setReadOnly(True)
         self.log_viewer.setToolTip("Displays application logs.")
+        self.log_viewer.document().setMaximumBlockCount(max_lines)
         for message in log_history:
             self.log_viewer.append(message)
         log_layout.addWidget(self.log_viewer)
@@ -110,14 +115,14 @@ class LogDialog(QDialog):
         actions_layout = QHBoxLayout()
         actions_layout.setContentsMargins(10, 15, 10, 10)
         
-        self.clear_button = QPushButton(QIcon(get_icon_path(self.theme_name, "edit-clear.svg")), "Clear Log")
+        self.clear_button = QPushButton(resources.icon(self.theme_name, "edit-clear.svg"), "Clear Log")
         self.clear_button.setToolTip("Clear the log content.")
         self.clear_button.clicked.connect(self.log_cleared.emit)
         actions_layout.addWidget(self.clear_button)
 
         actions_layout.addStretch()
 
-        self.back_button = QPushButton(QIcon(get_icon_path(self.theme_name, "go-previous.svg")), "Back")
+        self.back_button = QPushButton(resources.icon(self.theme_name, "go-previous.svg"), "Back")
         self.back_button.setToolTip("Return to the main window.")
         self.back_button.clicked.connect(self.accept)
         actions_layout.addWidget(self.back_button)
@@ -224,11 +229,11 @@ class FavoritesDialog(QDialog):
         self.setMinimumWidth(600)
 
     def update_icons(self):
-        self.add_button.setIcon(QIcon(get_icon_path(self.theme_name, "list-add.svg")))
-        self.edit_button.setIcon(QIcon(get_icon_path(self.theme_name, "document-save.svg")))
-        self.remove_button.setIcon(QIcon(get_icon_path(self.theme_name, "list-remove.svg")))
-        self.clear_button.setIcon(QIcon(get_icon_path(self.theme_name, "edit-clear.svg")))
-        self.back_button.setIcon(QIcon(get_icon_path(self.theme_name, "go-previous.svg")))
+        self.add_button.setIcon(resources.icon(self.theme_name, "list-add.svg"))
+        self.edit_button.setIcon(resources.icon(self.theme_name, "document-save.svg"))
+        self.remove_button.setIcon(resources.icon(self.theme_name, "list-remove.svg"))
+        self.clear_button.setIcon(resources.icon(self.theme_name, "edit-clear.svg"))
+        self.back_button.setIcon(resources.icon(self.theme_name, "go-previous.svg"))
         self.toggle_password_visibility(update_only=True)
 
     def load_favorites_to_table(self):
@@ -328,8 +333,424 @@ class FavoritesDialog(QDialog):
                 self.key_input.setEchoMode(QLineEdit.EchoMode.Password)
 
         if self.key_input.echoMode() == QLineEdit.EchoMode.Password:
-            self.toggle_password_button.setIcon(QIcon(get_icon_path(self.theme_name, "eye-hide.svg")))
+            self.toggle_password_button.setIcon(resources.icon(self.theme_name, "eye-hide.svg"))
             self.toggle_password_button.setToolTip("Show password.")
         else:
-            self.toggle_password_button.setIcon(QIcon(get_icon_path(self.theme_name, "eye-show.svg")))
-            self.toggle_password_button.setToolTip("Hide password.")
\ No newline at end of file
+            self.toggle_password_button.setIcon(resources.icon(self.theme_name, "eye-show.svg"))
+            self.toggle_password_button.setToolTip("Hide password.")
+
+
+class RenditionsDialog(QDialog):
+    def __init__(self, renditions, favorites, quality_presets, theme_name: str, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Simulcast Renditions")
+        self.renditions = [dict(rendition) for rendition in renditions]
+        self.theme_name = theme_name
+        self.layout = QVBoxLayout(self)
+
+        # Renditions List Group
+        list_group = QGroupBox("Extra Renditions")
+        list_layout = QVBoxLayout()
+        list_layout.setContentsMargins(10, 15, 10, 10)
+        info_label = QLabel("Each rendition is encoded from the same decode as the main stream and sent to its favorite server.")
+        info_label.setWordWrap(True)
+        list_layout.addWidget(info_label)
+        self.table = QTableWidget()
+        self.table.setColumnCount(2)
+        self.table.setHorizontalHeaderLabels(["Favorite", "Quality Preset"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setToolTip("Renditions sent together with the main stream.")
+        list_layout.addWidget(self.table)
+        list_group.setLayout(list_layout)
+        self.layout.addWidget(list_group)
+
+        # Form Group
+        form_group = QGroupBox("Add Rendition")
+        form_layout = QHBoxLayout()
+        form_layout.setContentsMargins(10, 15, 10, 10)
+        form_layout.addWidget(QLabel("Favorite:"))
+        self.favorite_select = QComboBox()
+        self.favorite_select.addItems([fav["name"] for fav in favorites])
+        self.favorite_select.setToolTip("Favorite server that receives this rendition.")
+        form_layout.addWidget(self.favorite_select)
+        form_layout.addWidget(QLabel("Quality Preset:"))
+        self.preset_select = QComboBox()
+        self.preset_select.addItems(quality_presets)
+        self.preset_select.setToolTip("Resolution and bitrate of this rendition.")
+        form_layout.addWidget(self.preset_select)
+        form_group.setLayout(form_layout)
+        self.layout.addWidget(form_group)
+
+        # Actions Group
+        actions_group = QGroupBox("Actions")
+        buttons_layout = QHBoxLayout()
+        buttons_layout.setContentsMargins(10, 15, 10, 10)
+        self.add_button = QPushButton(resources.icon(self.theme_name, "list-add.svg"), "Add")
+        self.add_button.setToolTip("Add a rendition.")
+        buttons_layout.addWidget(self.add_button)
+        self.remove_button = QPushButton(resources.icon(self.theme_name, "list-remove.svg"), "Remove")
+        self.remove_button.setToolTip("Remove the selected rendition.")
+        buttons_layout.addWidget(self.remove_button)
+        buttons_layout.addStretch()
+        self.back_button = QPushButton(resources.icon(self.theme_name, "go-previous.svg"), "Back")
+        self.back_button.setToolTip("Save and return to the main window.")
+        buttons_layout.addWidget(self.back_button)
+        actions_group.setLayout(buttons_layout)
+        self.layout.addWidget(actions_group)
+
+        self.add_button.setEnabled(bool(favorites))
+        self.load_renditions_to_table()
+
+        # Connect signals
+        self.add_button.clicked.connect(self.add_rendition)
+        self.remove_button.clicked.connect(self.remove_rendition)
+        self.back_button.clicked.connect(self.accept)
+
+        self.setMinimumWidth(500)
+
+    def load_renditions_to_table(self):
+        self.table.setRowCount(0)
+        for rendition in self.renditions:
+            row_position = self.table.rowCount()
+            self.table.insertRow(row_position)
+            self.table.setItem(row_position, 0, QTableWidgetItem(rendition["favorite"]))
+            self.table.setItem(row_position, 1, QTableWidgetItem(rendition["quality_preset"]))
+
+    def add_rendition(self):
+        rendition = {
+            "favorite": self.favorite_select.currentText(),
+            "quality_preset": self.preset_select.currentText()
+        }
+        if rendition in self.renditions:
+            QMessageBox.critical(self, "Error", "This rendition already exists.")
+            return
+        self.renditions.append(rendition)
+        self.load_renditions_to_table()
+
+    def remove_rendition(self):
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
+            return
+        del self.renditions[selected_rows[0].row()]
+        self.load_renditions_to_table()
+
+
+class LibraryDialog(QDialog):
+    def __init__(self, library, directories, theme_name: str, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Media Library")
+        self.library = library
+        self.directories = list(directories)
+        self.theme_name = theme_name
+        self.selected_path = None
+        # Thumbnails per (thumbnail, video mtime), so refilling the table on search is cheap
+        self.thumbnail_icons = {}
+        self.layout = QVBoxLayout(self)
+
+        # Folders Group
+        folders_group = QGroupBox("Library Folders")
+        folders_layout = QHBoxLayout()
+        folders_layout.setContentsMargins(10, 15, 10, 10)
+        self.folder_list = QListWidget()
+        self.folder_list.addItems(self.directories)
+        self.folder_list.setToolTip("Folders scanned for video files (including subfolders).")
+        self.folder_list.setMaximumHeight(80)
+        folders_layout.addWidget(self.folder_list)
+        folder_buttons_layout = QVBoxLayout()
+        self.add_folder_button = QPushButton(resources.icon(self.theme_name, "list-add.svg"), "Add")
+        self.add_folder_button.setToolTip("Add a folder to the library.")
+        folder_buttons_layout.addWidget(self.add_folder_button)
+        self.remove_folder_button = QPushButton(resources.icon(self.theme_name, "list-remove.svg"), "Remove")
+        self.remove_folder_button.setToolTip("Remove the selected folder from the library.")
+        folder_buttons_layout.addWidget(self.remove_folder_button)
+        folders_layout.addLayout(folder_buttons_layout)
+        folders_group.setLayout(folders_layout)
+        self.layout.addWidget(folders_group)
+
+        # Videos Group
+        videos_group = QGroupBox("Videos")
+        videos_layout = QVBoxLayout()
+        videos_layout.setContentsMargins(10, 15, 10, 10)
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(QLabel("Search:"))
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Part of the file name or path")
+        self.search_input.setToolTip("Filter the indexed videos.")
+        search_layout.addWidget(self.search_input)
+        videos_layout.addLayout(search_layout)
+        self.table = QTableWidget()
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(["File", "Duration", "Resolution", "Codecs"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setIconSize(QSize(THUMBNAIL_WIDTH // 2, THUMBNAIL_WIDTH * 9 // 32))
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setToolTip("Double-click a video to use it as the source.")
+        videos_layout.addWidget(self.table)
+        self.status_label = QLabel()
+        videos_layout.addWidget(self.status_label)
+        videos_group.setLayout(videos_layout)
+        self.layout.addWidget(videos_group)
+
+        # Actions Group
+        actions_group = QGroupBox("Actions")
+        buttons_layout = QHBoxLayout()
+        buttons_layout.setContentsMargins(10, 15, 10, 10)
+        self.rescan_button = QPushButton(resources.icon(self.theme_name, "view-list-text.svg"), "Rescan")
+        self.rescan_button.setToolTip("Index new and changed videos in the library folders.")
+        buttons_layout.addWidget(self.rescan_button)
+        buttons_layout.addStretch()
+        self.use_button = QPushButton(resources.icon(self.theme_name, "document-open.svg"), "Use Video")
+        self.use_button.setToolTip("Use the selected video as the source.")
+        buttons_layout.addWidget(self.use_button)
+        self.back_button = QPushButton(resources.icon(self.theme_name, "go-previous.svg"), "Back")
+        self.back_button.setToolTip("Save the folders and return to the main window.")
+        buttons_layout.addWidget(self.back_button)
+        actions_group.setLayout(buttons_layout)
+        self.layout.addWidget(actions_group)
+
+        # Connect signals
+        self.add_folder_button.clicked.connect(self.add_folder)
+        self.remove_folder_button.clicked.connect(self.remove_folder)
+        self.search_input.textChanged.connect(self.load_entries_to_table)
+        self.table.itemDoubleClicked.connect(self.use_selected)
+        self.rescan_button.clicked.connect(self.rescan)
+        self.use_button.clicked.connect(self.use_selected)
+        self.back_button.clicked.connect(self.accept)
+        self.library.scan_progress.connect(self.on_scan_progress)
+        self.library.scan_finished.connect(self.on_scan_finished)
+
+        # The index is shown right away; the rescan only adds what changed
+        self.load_entries_to_table()
+        self.rescan()
+
+        self.setMinimumSize(700, 500)
+
+    def load_entries_to_table(self):
+        self.entries = self.library.entries(self.search_input.text())
+        self.table.setRowCount(len(self.entries))
+        for row, entry in enumerate(self.entries):
+            name_item = QTableWidgetItem(entry["path"])
+            if entry["thumbnail"]:
+                key = (entry["thumbnail"], entry["mtime"])
+                if key not in self.thumbnail_icons:
+                    # QIcon only reads the file when the row is painted
+                    self.thumbnail_icons[key] = QIcon(entry["thumbnail"])
+                name_item.setIcon(self.thumbnail_icons[key])
+            if entry["error"]:
+                name_item.setToolTip(entry["error"])
+            self.table.setItem(row, 0, name_item)
+            self.table.setItem(row, 1, QTableWidgetItem(format_duration(entry["duration"])))
+            resolution = f"{entry['width']}x{entry['height']}" if entry["width"] else "?"
+            self.table.setItem(row, 2, QTableWidgetItem(resolution))
+            codecs = " / ".join(codec for codec in (entry["vcodec"], entry["acodec"]) if codec) or "?"
+            self.table.setItem(row, 3, QTableWidgetItem(codecs))
+        self.status_label.setText(f"{len(self.entries)} videos")
+
+    def add_folder(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select a library folder")
+        if directory and directory not in self.directories:
+            self.directories.append(directory)
+            self.folder_list.addItem(directory)
+            self.rescan()
+
+    def remove_folder(self):
+        row = self.folder_list.currentRow()
+        if row < 0:
+            return
+        del self.directories[row]
+        self.folder_list.takeItem(row)
+        self.rescan()
+
+    def rescan(self):
+        if self.library.rescan(self.directories):
+            self.rescan_button.setEnabled(False)
+            self.status_label.setText("Scanning...")
+
+    def on_scan_progress(self, done, total):
+        if total:
+            self.status_label.setText(f"Probing videos: {done}/{total}")
+
+    def on_scan_finished(self):
+        self.rescan_button.setEnabled(True)
+        self.load_entries_to_table()
+
+    def done(self, result):
+        # The library outlives the dialog; stop refreshing a closed table
+        self.library.scan_progress.disconnect(self.on_scan_progress)
+        self.library.scan_finished.disconnect(self.on_scan_finished)
+        self.thumbnail_icons.clear()
+        super().done(result)
+
+    def use_selected(self):
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
+            return
+        self.selected_path = self.entries[selected_rows[0].row()]["path"]
+        self.accept()
+
+
+class ScheduleDialog(QDialog):
+    def __init__(self, schedules, favorites, quality_presets, theme_name: str, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Scheduled Streams")
+        self.schedules = [dict(schedule) for schedule in schedules]
+        self.theme_name = theme_name
+        self.layout = QVBoxLayout(self)
+
+        # Schedules List Group
+        list_group = QGroupBox("Schedules")
+        list_layout = QVBoxLayout()
+        list_layout.setContentsMargins(10, 15, 10, 10)
+        info_label = QLabel("Sources are resolved, probed and checked a couple of minutes before the start time, so the stream goes live on time.")
+        info_label.setWordWrap(True)
+        list_layout.addWidget(info_label)
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["Name", "Days", "Time", "Source", "Favorite"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setToolTip("Streams started and stopped automatically.")
+        list_layout.addWidget(self.table)
+        list_group.setLayout(list_layout)
+        self.layout.addWidget(list_group)
+
+        # Form Group
+        form_group = QGroupBox("Add Schedule")
+        form_layout = QVBoxLayout()
+        form_layout.setContentsMargins(10, 15, 10, 10)
+
+        name_layout = QHBoxLayout()
+        name_layout.addWidget(QLabel("Name:"))
+        self.name_input = QLineEdit()
+        self.name_input.setPlaceholderText("e.g.: Evening Show")
+        self.name_input.setToolTip("A unique name for this schedule.")
+        name_layout.addWidget(self.name_input)
+        form_layout.addLayout(name_layout)
+
+        days_layout = QHBoxLayout()
+        days_layout.addWidget(QLabel("Days:"))
+        self.day_checkboxes = []
+        for day_name in DAY_NAMES:
+            checkbox = QCheckBox(day_name)
+            checkbox.setChecked(True)
+            self.day_checkboxes.append(checkbox)
+            days_layout.addWidget(checkbox)
+        days_layout.addStretch()
+        form_layout.addLayout(days_layout)
+
+        time_layout = QHBoxLayout()
+        time_layout.addWidget(QLabel("Start:"))
+        self.start_edit = QTimeEdit(QTime(20, 0))
+        self.start_edit.setDisplayFormat("HH:mm")
+        self.start_edit.setToolTip("Time the stream goes live.")
+        time_layout.addWidget(self.start_edit)
+        time_layout.addWidget(QLabel("Stop:"))
+        self.stop_edit = QTimeEdit(QTime(21, 0))
+        self.stop_edit.setDisplayFormat("HH:mm")
+        self.stop_edit.setToolTip("Time the stream is stopped (earlier than the start time means the next day).")
+        time_layout.addWidget(self.stop_edit)
+        time_layout.addStretch()
+        form_layout.addLayout(time_layout)
+
+        source_layout = QHBoxLayout()
+        source_layout.addWidget(QLabel("Source:"))
+        self.source_input = QLineEdit()
+        self.source_input.setPlaceholderText("Video path or YouTube URL")
+        self.source_input.setToolTip("Local video file or YouTube URL to stream.")
+        source_layout.addWidget(self.source_input)
+        form_layout.addLayout(source_layout)
+
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Favorite:"))
+        self.favorite_select = QComboBox()
+        self.favorite_select.addItems([fav["name"] for fav in favorites])
+        self.favorite_select.setToolTip("Favorite server that receives the stream.")
+        options_layout.addWidget(self.favorite_select)
+        options_layout.addWidget(QLabel("Quality Preset:"))
+        self.preset_select = QComboBox()
+        self.preset_select.addItems(quality_presets)
+        options_layout.addWidget(self.preset_select)
+        self.loop_mode_select = QComboBox()
+        self.loop_mode_select.addItems(["Loop Infinitely", "Play Once"])
+        options_layout.addWidget(self.loop_mode_select)
+        self.live_story_checkbox = QCheckBox("Live Story (9:16)")
+        options_layout.addWidget(self.live_story_checkbox)
+        form_layout.addLayout(options_layout)
+        form_group.setLayout(form_layout)
+        self.layout.addWidget(form_group)
+
+        # Actions Group
+        actions_group = QGroupBox("Actions")
+        buttons_layout = QHBoxLayout()
+        buttons_layout.setContentsMargins(10, 15, 10, 10)
+        self.add_button = QPushButton(resources.icon(self.theme_name, "list-add.svg"), "Add")
+        self.add_button.setToolTip("Add a schedule.")
+        buttons_layout.addWidget(self.add_button)
+        self.remove_button = QPushButton(resources.icon(self.theme_name, "list-remove.svg"), "Remove")
+        self.remove_button.setToolTip("Remove the selected schedule.")
+        buttons_layout.addWidget(self.remove_button)
+        buttons_layout.addStretch()
+        self.back_button = QPushButton(resources.icon(self.theme_name, "go-previous.svg"), "Back")
+        self.back_button.setToolTip("Save and return to the main window.")
+        buttons_layout.addWidget(self.back_button)
+        actions_group.setLayout(buttons_layout)
+        self.layout.addWidget(actions_group)
+
+        self.add_button.setEnabled(bool(favorites))
+        self.load_schedules_to_table()
+
+        # Connect signals
+        self.add_button.clicked.connect(self.add_schedule)
+        self.remove_button.clicked.connect(self.remove_schedule)
+        self.back_button.clicked.connect(self.accept)
+
+        self.setMinimumWidth(650)
+
+    def load_schedules_to_table(self):
+        self.table.setRowCount(0)
+        for schedule in self.schedules:
+            row_position = self.table.rowCount()
+            self.table.insertRow(row_position)
+            days = ", ".join(DAY_NAMES[day] for day in schedule["days"]) if len(schedule["days"]) < 7 else "Every day"
+            self.table.setItem(row_position, 0, QTableWidgetItem(schedule["name"]))
+            self.table.setItem(row_position, 1, QTableWidgetItem(days))
+            self.table.setItem(row_position, 2, QTableWidgetItem(f"{schedule['start']}-{schedule['stop']}"))
+            self.table.setItem(row_position, 3, QTableWidgetItem(schedule["source"]))
+            self.table.setItem(row_position, 4, QTableWidgetItem(schedule["favorite"]))
+
+    def add_schedule(self):
+        schedule = {
+            "name": self.name_input.text().strip(),
+            "enabled": True,
+            "days": [day for day, checkbox in enumerate(self.day_checkboxes) if checkbox.isChecked()],
+            "start": self.start_edit.time().toString("HH:mm"),
+            "stop": self.stop_edit.time().toString("HH:mm"),
+            "source": self.source_input.text().strip(),
+            "favorite": self.favorite_select.currentText(),
+            "quality_preset": self.preset_select.currentText(),
+            "loop_mode": self.loop_mode_select.currentText(),
+            "live_story": self.live_story_checkbox.isChecked()
+        }
+        if not schedule["name"] or not schedule["source"] or not schedule["days"]:
+            QMessageBox.critical(self, "Error", "Name, source and at least one day are required.")
+            return
+        if schedule["start"] == schedule["stop"]:
+            QMessageBox.critical(self, "Error", "Start and stop times must be different.")
+            return
+        if any(existing["name"] == schedule["name"] for existing in self.schedules):
+            QMessageBox.critical(self, "Error", "A schedule with this name already exists.")
+            return
+        self.schedules.append(schedule)
+        self.load_schedules_to_table()
+
+    def remove_schedule(self):
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
+            return
+        del self.schedules[selected_rows[0].row()]
+        self.load_schedules_to_table()
@@ -1,17 +1,36 @@
 
-import sys
 import os
+import time
 import datetime
+from collections import deque
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QComboBox, QDialog,
-    QFileDialog, QMessageBox, QCheckBox, QGroupBox, QSizePolicy
+    QFileDialog, QMessageBox, QCheckBox, QGroupBox, QSizePolicy, QSpinBox
 )
-from PyQt6.QtCore import QThread, Qt, QSize
-from PyQt6.QtGui import QKeyEvent, QIcon
+from PyQt6.QtCore import QThread, Qt, QSize, QMetaObject, QTimer
+from PyQt6.QtGui import QKeyEvent, QImage, QPixmap
+import resources
 from config import load_config, save_config
-from dialogs import AboutDialog, LogDialog, FavoritesDialog
+from archive import DEFAULT_ARCHIVE, DEFAULT_ARCHIVE_DIR
+from presets import QUALITY_PRESETS
+from overlays import DEFAULT_OVERLAYS, prepare_overlays
+from preview import DEFAULT_PREVIEW, preview_path
+from renditions import top_stage_size
+from stall_watchdog import DEFAULT_WATCHDOG
+from tracing import StartupTrace
+from cpu_budget import DEFAULT_CPU_BUDGET, available_cores, parse_cpu_list
+from dialogs import AboutDialog, LogDialog, FavoritesDialog, RenditionsDialog, LibraryDialog, ScheduleDialog
+from media_library import DEFAULT_LIBRARY, MediaLibrary, format_duration
+from resume import checkpoint_key, prune, resume_position
+from scheduler import CHECK_INTERVAL_MS, PREPARED_MAX_AGE_SECONDS, StreamPreparer, due_events, has_valid_times, next_start
 from streamer import Streamer
+from youtube_cache import DEFAULT_YOUTUBE_CACHE, YouTubeCache
+
+# Keeps memory flat on streams that run (and re-loop) for days
+MAX_LOG_LINES = 10000
+PREVIEW_SIZE = QSize(160, 90)
+PREVIEW_POLL_MS = 1000
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -20,7 +39,7 @@ class MainWindow(QMainWindow):
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
         self.layout = QVBoxLayout(self.central_widget)
-        self.log_history = []
+        self.log_history = deque(maxlen=MAX_LOG_LINES)
         self.log_dialog = None
         self.last_stream_info = {}
         self.user_stopped_stream = False
@@ -30,12 +49,52 @@ class MainWindow(QMainWindow):
         # Load config
         self.config = load_config()
         self.favorites = self.config.get("favorites", [])
+        self.renditions = self.config.get("renditions", [])
+        self.schedules = self.config.get("schedules", [])
         self.current_theme = self.config.get("theme", "dark")
+        cache_config = {**DEFAULT_YOUTUBE_CACHE, **self.config.get("youtube_cache", {})}
+        self.youtube_cache = YouTubeCache(cache_config["directory"], cache_config["max_size_gb"])
+        self.youtube_cache.log_message.connect(self.log_message)
+        self.media_library = MediaLibrary()
+        self.media_library.log_message.connect(self.log_message)
+        self.stream_preparer = StreamPreparer()
+        self.stream_preparer.log_message.connect(self.log_message)
+        self.stream_preparer.prepared.connect(self.on_stream_prepared)
+        self.prepared_sources = {}
+        self.pending_prepared = None
+        self.scheduled_stream = None
+        self.preview_path = preview_path()
+        self.preview_mtime = None
 
         # --- UI Setup ---
         self._init_ui()
         self.live_story_checkbox.setChecked(self.config.get("live_story", False))
-        self.apply_theme() # Apply theme and icons
+        self.load_cpu_budget()
+        self.cache_checkbox.setChecked(cache_config["enabled"])
+        self.cache_size_spin.setValue(int(cache_config["max_size_gb"]))
+        self.load_archive_config()
+        watchdog_config = {**DEFAULT_WATCHDOG, **self.config.get("watchdog", {})}
+        self.watchdog_checkbox.setChecked(watchdog_config["enabled"])
+        self.watchdog_timeout_spin.setValue(watchdog_config["stall_seconds"])
+        self.trace_checkbox.setChecked(self.config.get("trace_startup", False))
+        self.load_overlay_config()
+        preview_config = {**DEFAULT_PREVIEW, **self.config.get("preview", {})}
+        self.preview_checkbox.setChecked(preview_config["enabled"])
+        self.preview_interval_spin.setValue(preview_config["interval_seconds"])
+        # Apply theme and icons
+        self.apply_theme()
+
+        self.preview_timer = QTimer(self)
+        self.preview_timer.timeout.connect(self.refresh_preview)
+
+        for schedule in self.schedules:
+            if not has_valid_times(schedule):
+                self.log_message(f"[WARNING] Schedule '{schedule.get('name', '')}' has an invalid start or stop time and will be skipped.")
+
+        self.last_schedule_check = datetime.datetime.now()
+        self.schedule_timer = QTimer(self)
+        self.schedule_timer.timeout.connect(self.check_schedules)
+        self.schedule_timer.start(CHECK_INTERVAL_MS)
 
     def _init_ui(self):
         # --- Source Group ---
@@ -52,6 +111,9 @@ class MainWindow(QMainWindow):
         self.browse_button = QPushButton("")
         self.browse_button.setToolTip("Browse for a video file.")
         video_path_layout.addWidget(self.browse_button)
+        self.library_button = QPushButton("Library...")
+        self.library_button.setToolTip("Pick a video from the indexed library folders.")
+        video_path_layout.addWidget(self.library_button)
         source_layout.addLayout(video_path_layout)
 
         youtube_url_layout = QHBoxLayout()
@@ -98,6 +160,15 @@ class MainWindow(QMainWindow):
         stream_key_layout.addWidget(self.toggle_password_button)
         server_layout.addLayout(stream_key_layout)
 
+        simulcast_layout = QHBoxLayout()
+        self.simulcast_label = QLabel()
+        simulcast_layout.addWidget(self.simulcast_label)
+        simulcast_layout.addStretch()
+        self.simulcast_button = QPushButton("Simulcast...")
+        self.simulcast_button.setToolTip("Send extra renditions to other favorite servers from the same decode.")
+        simulcast_layout.addWidget(self.simulcast_button)
+        server_layout.addLayout(simulcast_layout)
+
         server_group.setLayout(server_layout)
         self.layout.addWidget(server_group)
 
@@ -129,20 +200,122 @@ class MainWindow(QMainWindow):
         loop_layout.addStretch()
         options_layout.addLayout(loop_layout)
 
+        cache_layout = QHBoxLayout()
+        self.cache_checkbox = QCheckBox("Cache YouTube Loops")
+        self.cache_checkbox.setToolTip("Download looping YouTube videos in the background and loop from the local copy once done.")
+        cache_layout.addWidget(self.cache_checkbox)
+        cache_layout.addWidget(QLabel("Cache Size (GB):"))
+        self.cache_size_spin = QSpinBox()
+        self.cache_size_spin.setRange(1, 1000)
+        self.cache_size_spin.setToolTip("Least recently used videos are removed when the cache grows past this size.")
+        cache_layout.addWidget(self.cache_size_spin)
+        cache_layout.addStretch()
+        options_layout.addLayout(cache_layout)
+
         quality_layout = QHBoxLayout()
         quality_layout.addWidget(QLabel("Quality Preset:"))
         self.quality_preset_select = QComboBox()
-        self.quality_preset_select.addItems([
-            "Source Quality",
-            "1080p (5 Mbps)",
-            "720p (3 Mbps)",
-            "480p (1.5 Mbps)"
-        ])
+        self.quality_preset_select.addItems(["Source Quality", *QUALITY_PRESETS])
         self.quality_preset_select.setToolTip("Choose the resolution and bitrate for the stream.")
         quality_layout.addWidget(self.quality_preset_select)
         quality_layout.addStretch()
         options_layout.addLayout(quality_layout)
 
+        cpu_layout = QHBoxLayout()
+        self.cpu_auto_checkbox = QCheckBox("Auto CPU")
+        self.cpu_auto_checkbox.setToolTip("Divide the host's cores among running streams automatically.")
+        cpu_layout.addWidget(self.cpu_auto_checkbox)
+        cpu_layout.addWidget(QLabel("Threads:"))
+        self.cpu_threads_spin = QSpinBox()
+        self.cpu_threads_spin.setRange(0, len(available_cores()) * 2)
+        self.cpu_threads_spin.setSpecialValueText("Default")
+        self.cpu_threads_spin.setToolTip("Encoder thread count (Default lets ffmpeg decide).")
+        cpu_layout.addWidget(self.cpu_threads_spin)
+        cpu_layout.addWidget(QLabel("Filter Threads:"))
+        self.cpu_filter_threads_spin = QSpinBox()
+        self.cpu_filter_threads_spin.setRange(0, len(available_cores()) * 2)
+        self.cpu_filter_threads_spin.setSpecialValueText("Default")
+        self.cpu_filter_threads_spin.setToolTip("Filter graph thread count (Default lets ffmpeg decide).")
+        cpu_layout.addWidget(self.cpu_filter_threads_spin)
+        cpu_layout.addWidget(QLabel("Cores:"))
+        self.cpu_affinity_input = QLineEdit()
+        self.cpu_affinity_input.setPlaceholderText("e.g.: 0-3")
+        self.cpu_affinity_input.setToolTip("Pin ffmpeg to these CPU cores (empty for no pinning).")
+        cpu_layout.addWidget(self.cpu_affinity_input)
+        cpu_layout.addWidget(QLabel("Nice:"))
+        self.cpu_nice_spin = QSpinBox()
+        self.cpu_nice_spin.setRange(-20, 19)
+        self.cpu_nice_spin.setToolTip("Scheduler priority for ffmpeg (higher is nicer to other processes).")
+        cpu_layout.addWidget(self.cpu_nice_spin)
+        options_layout.addLayout(cpu_layout)
+
+        archive_layout = QHBoxLayout()
+        self.archive_checkbox = QCheckBox("Archive Locally")
+        self.archive_checkbox.setToolTip("Also write the encoded stream to local segment files (no extra encoding).")
+        archive_layout.addWidget(self.archive_checkbox)
+        self.archive_dir_input = QLineEdit()
+        self.archive_dir_input.setPlaceholderText(DEFAULT_ARCHIVE_DIR)
+        self.archive_dir_input.setToolTip("Directory for the archive segments.")
+        archive_layout.addWidget(self.archive_dir_input)
+        archive_layout.addWidget(QLabel("Segment (min):"))
+        self.archive_segment_spin = QSpinBox()
+        self.archive_segment_spin.setRange(1, 240)
+        self.archive_segment_spin.setToolTip("Duration of each archive segment.")
+        archive_layout.addWidget(self.archive_segment_spin)
+        archive_layout.addWidget(QLabel("Quota (GB):"))
+        self.archive_quota_spin = QSpinBox()
+        self.archive_quota_spin.setRange(1, 10000)
+        self.archive_quota_spin.setToolTip("Oldest segments are deleted when the archive grows past this size.")
+        archive_layout.addWidget(self.archive_quota_spin)
+        options_layout.addLayout(archive_layout)
+
+        watchdog_layout = QHBoxLayout()
+        self.watchdog_checkbox = QCheckBox("Stall Watchdog")
+        self.watchdog_checkbox.setToolTip("Restart ffmpeg when its output stops advancing.")
+        watchdog_layout.addWidget(self.watchdog_checkbox)
+        watchdog_layout.addWidget(QLabel("Stall Timeout (s):"))
+        self.watchdog_timeout_spin = QSpinBox()
+        self.watchdog_timeout_spin.setRange(5, 600)
+        self.watchdog_timeout_spin.setToolTip("Seconds without new frames or bytes before the pipeline is restarted.")
+        watchdog_layout.addWidget(self.watchdog_timeout_spin)
+        self.preview_checkbox = QCheckBox("Live Preview")
+        self.preview_checkbox.setToolTip("Show a small frame of what is being streamed, taken from the running ffmpeg (no second decode).")
+        watchdog_layout.addWidget(self.preview_checkbox)
+        watchdog_layout.addWidget(QLabel("Every (s):"))
+        self.preview_interval_spin = QSpinBox()
+        self.preview_interval_spin.setRange(1, 60)
+        self.preview_interval_spin.setToolTip("Seconds between preview frames.")
+        watchdog_layout.addWidget(self.preview_interval_spin)
+        watchdog_layout.addStretch()
+        self.trace_checkbox = QCheckBox("Export Startup Traces")
+        self.trace_checkbox.setToolTip("Save a Chrome/Perfetto trace of each stream start to the traces folder.")
+        watchdog_layout.addWidget(self.trace_checkbox)
+        options_layout.addLayout(watchdog_layout)
+
+        overlay_layout = QHBoxLayout()
+        self.overlay_checkbox = QCheckBox("Overlays")
+        self.overlay_checkbox.setToolTip("Composite a logo and a text badge onto the stream (rendered once, not per frame).")
+        overlay_layout.addWidget(self.overlay_checkbox)
+        overlay_layout.addWidget(QLabel("Logo:"))
+        self.overlay_logo_input = QLineEdit()
+        self.overlay_logo_input.setPlaceholderText("e.g.: /home/user/logo.png")
+        self.overlay_logo_input.setToolTip("Image shown in the corner of the stream (empty for none).")
+        overlay_layout.addWidget(self.overlay_logo_input)
+        self.overlay_logo_button = QPushButton("")
+        self.overlay_logo_button.setToolTip("Browse for a logo image.")
+        overlay_layout.addWidget(self.overlay_logo_button)
+        overlay_layout.addWidget(QLabel("Text:"))
+        self.overlay_text_input = QLineEdit()
+        self.overlay_text_input.setPlaceholderText("e.g.: LIVE")
+        self.overlay_text_input.setToolTip("Text of the badge (empty for none).")
+        overlay_layout.addWidget(self.overlay_text_input)
+        overlay_layout.addWidget(QLabel("Size:"))
+        self.overlay_size_spin = QSpinBox()
+        self.overlay_size_spin.setRange(8, 200)
+        self.overlay_size_spin.setToolTip("Badge font size in pixels for a 1080p frame; scaled to the output.")
+        overlay_layout.addWidget(self.overlay_size_spin)
+        options_layout.addLayout(overlay_layout)
+
         options_group.setLayout(options_layout)
         self.layout.addWidget(options_group)
 
@@ -150,6 +323,12 @@ class MainWindow(QMainWindow):
         actions_group = QGroupBox("Actions")
         action_buttons_layout = QHBoxLayout()
         action_buttons_layout.setContentsMargins(10, 15, 10, 10)
+        self.preview_label = QLabel("No preview")
+        self.preview_label.setObjectName("preview_label")
+        self.preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_label.setFixedSize(PREVIEW_SIZE)
+        self.preview_label.setToolTip("Latest frame sent to the server.")
+        action_buttons_layout.addWidget(self.preview_label)
         self.start_button = QPushButton("Start Stream")
         self.start_button.setObjectName("start_button")
         self.start_button.setToolTip("Start the stream.")
@@ -175,6 +354,8 @@ class MainWindow(QMainWindow):
         self.favorites_button = QPushButton("Manage Favorites")
         self.favorites_button.setToolTip("Manage favorite servers.")
         utility_buttons_layout.addWidget(self.favorites_button)
+        self.schedules_button = QPushButton("Schedules")
+        utility_buttons_layout.addWidget(self.schedules_button)
         self.about_button = QPushButton("About/Donate")
         self.about_button.setToolTip("About the application.")
         utility_buttons_layout.addWidget(self.about_button)
@@ -186,10 +367,13 @@ class MainWindow(QMainWindow):
         self.layout.addLayout(utility_buttons_layout)
 
         self.populate_favorites_dropdown()
+        self.update_simulcast_label()
+        self.update_schedules_button()
 
         # --- Icon Mapping ---
         self.icon_map = {
             self.browse_button: "document-open.svg",
+            self.overlay_logo_button: "document-open.svg",
             self.start_button: "media-playback-start.svg",
             self.stop_button: "media-playback-stop.svg",
             self.log_button: "view-list-text.svg",
@@ -200,6 +384,8 @@ class MainWindow(QMainWindow):
 
         # --- Connect signals ---
         self.browse_button.clicked.connect(self.browse_file)
+        self.library_button.clicked.connect(self.show_library_dialog)
+        self.overlay_logo_button.clicked.connect(self.browse_logo)
         self.toggle_password_button.clicked.connect(self.toggle_password_visibility)
         self.video_path_input.textChanged.connect(self.video_path_changed)
         self.youtube_url_input.textChanged.connect(self.youtube_url_changed)
@@ -208,19 +394,15 @@ class MainWindow(QMainWindow):
         self.log_button.clicked.connect(self.show_log_dialog)
         self.save_log_button.clicked.connect(self.save_log_to_file)
         self.favorites_button.clicked.connect(self.show_favorites_dialog)
+        self.simulcast_button.clicked.connect(self.show_renditions_dialog)
         self.start_button.clicked.connect(self.start_streaming)
         self.stop_button.clicked.connect(self.stop_streaming)
         self.theme_button.clicked.connect(self.toggle_theme)
+        self.cpu_auto_checkbox.toggled.connect(self.cpu_auto_toggled)
+        self.schedules_button.clicked.connect(self.show_schedule_dialog)
 
         self.setMinimumWidth(600)
 
-    def get_icon_path(self, icon_name):
-        if getattr(sys, 'frozen', False):
-            base_path = sys._MEIPASS
-        else:
-            base_path = os.path.dirname(__file__)
-        return os.path.join(base_path, "themes", "icons", self.current_theme, icon_name)
-
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key.Key_D:
             self.toggle_theme()
@@ -235,34 +417,98 @@ class MainWindow(QMainWindow):
         self.apply_theme()
 
     def apply_theme(self):
-        if getattr(sys, 'frozen', False):
-            base_path = sys._MEIPASS
+        qss = resources.stylesheet(self.current_theme)
+        if qss is not None:
+            self.setStyleSheet(qss)
         else:
-            base_path = os.path.dirname(__file__)
-
-        qss_file = os.path.join(base_path, f"themes/{self.current_theme}.qss")
-        try:
-            with open(qss_file, "r") as f:
-                self.setStyleSheet(f.read())
-        except FileNotFoundError:
-            print(f"Theme file not found: {qss_file}")
+            print(f"Theme file not found: themes/{self.current_theme}.qss")
         
         # Update icons
         for button, icon_name in self.icon_map.items():
-            button.setIcon(QIcon(self.get_icon_path(icon_name)))
+            button.setIcon(resources.icon(self.current_theme, icon_name))
         
         if self.current_theme == "dark":
-            self.theme_button.setIcon(QIcon(self.get_icon_path("weather-clear.svg")))
+            self.theme_button.setIcon(resources.icon(self.current_theme, "weather-clear.svg"))
         else:
-            self.theme_button.setIcon(QIcon(self.get_icon_path("weather-clear-night.svg")))
+            self.theme_button.setIcon(resources.icon(self.current_theme, "weather-clear-night.svg"))
 
         self.toggle_password_visibility(update_only=True) # Update eye icon
 
+    def load_cpu_budget(self):
+        budget = {**DEFAULT_CPU_BUDGET, **self.config.get("cpu_budget", {})}
+        self.cpu_auto_checkbox.setChecked(budget["auto"])
+        self.cpu_threads_spin.setValue(budget["threads"])
+        self.cpu_filter_threads_spin.setValue(budget["filter_threads"])
+        self.cpu_affinity_input.setText(budget["affinity"])
+        self.cpu_nice_spin.setValue(budget["nice"])
+        self.cpu_auto_toggled(budget["auto"])
+
+    def cpu_auto_toggled(self, checked):
+        self.cpu_threads_spin.setEnabled(not checked)
+        self.cpu_filter_threads_spin.setEnabled(not checked)
+        self.cpu_affinity_input.setEnabled(not checked)
+
+    def get_cpu_budget(self):
+        return {
+            "auto": self.cpu_auto_checkbox.isChecked(),
+            "threads": self.cpu_threads_spin.value(),
+            "filter_threads": self.cpu_filter_threads_spin.value(),
+            "affinity": self.cpu_affinity_input.text().strip(),
+            "nice": self.cpu_nice_spin.value()
+        }
+
+    def load_archive_config(self):
+        archive_config = {**DEFAULT_ARCHIVE, **self.config.get("archive", {})}
+        self.archive_checkbox.setChecked(archive_config["enabled"])
+        self.archive_dir_input.setText(archive_config["directory"])
+        self.archive_segment_spin.setValue(archive_config["segment_minutes"])
+        self.archive_quota_spin.setValue(int(archive_config["quota_gb"]))
+
+    def get_archive_config(self):
+        return {
+            "enabled": self.archive_checkbox.isChecked(),
+            "directory": self.archive_dir_input.text().strip(),
+            "segment_minutes": self.archive_segment_spin.value(),
+            "quota_gb": self.archive_quota_spin.value()
+        }
+
+    def load_overlay_config(self):
+        overlay_config = {**DEFAULT_OVERLAYS, **self.config.get("overlays", {})}
+        self.overlay_checkbox.setChecked(overlay_config["enabled"])
+        self.overlay_logo_input.setText(overlay_config["logo_path"])
+        self.overlay_text_input.setText(overlay_config["text"])
+        self.overlay_size_spin.setValue(overlay_config["font_size"])
+
+    def get_overlay_config(self):
+        # Font and positions are only set in config.json
+        return {
+            **DEFAULT_OVERLAYS,
+            **self.config.get("overlays", {}),
+            "enabled": self.overlay_checkbox.isChecked(),
+            "logo_path": self.overlay_logo_input.text().strip(),
+            "text": self.overlay_text_input.text(),
+            "font_size": self.overlay_size_spin.value()
+        }
+
+    def browse_logo(self):
+        file_name, __ = QFileDialog.getOpenFileName(self, "Select a logo image", "", "Images (*.png *.jpg *.jpeg *.svg *.webp)")
+        if file_name:
+            self.overlay_logo_input.setText(file_name)
+
     def browse_file(self):
         file_name, __ = QFileDialog.getOpenFileName(self, "Select a video file", "", "Video Files (*.mp4 *.mkv *.avi *.mov)")
         if file_name:
             self.video_path_input.setText(file_name)
 
+    def show_library_dialog(self):
+        library_config = {**DEFAULT_LIBRARY, **self.config.get("library", {})}
+        dialog = LibraryDialog(self.media_library, library_config["directories"], self.current_theme, self)
+        dialog.exec()
+        self.config["library"] = {**library_config, "directories": dialog.directories}
+        save_config(self.config)
+        if dialog.selected_path:
+            self.video_path_input.setText(dialog.selected_path)
+
     def toggle_password_visibility(self, update_only=False):
         if not update_only:
             is_password = self.stream_key_input.echoMode() == QLineEdit.EchoMode.Password
@@ -272,9 +518,9 @@ class MainWindow(QMainWindow):
                 self.stream_key_input.setEchoMode(QLineEdit.EchoMode.Password)
         
         if self.stream_key_input.echoMode() == QLineEdit.EchoMode.Password:
-            self.toggle_password_button.setIcon(QIcon(self.get_icon_path("eye-hide.svg")))
+            self.toggle_password_button.setIcon(resources.icon(self.current_theme, "eye-hide.svg"))
         else:
-            self.toggle_password_button.setIcon(QIcon(self.get_icon_path("eye-show.svg")))
+            self.toggle_password_button.setIcon(resources.icon(self.current_theme, "eye-show.svg"))
 
     def video_path_changed(self, text):
         if text:
@@ -288,9 +534,11 @@ class MainWindow(QMainWindow):
             self.video_path_input.clear()
             self.video_path_input.setEnabled(False)
             self.browse_button.setEnabled(False)
+            self.library_button.setEnabled(False)
         else:
             self.video_path_input.setEnabled(True)
             self.browse_button.setEnabled(True)
+            self.library_button.setEnabled(True)
 
     def populate_favorites_dropdown(self):
         self.favorite_server_select.clear()
@@ -322,7 +570,7 @@ class MainWindow(QMainWindow):
 
     def show_log_dialog(self):
         if not self.log_dialog:
-            self.log_dialog = LogDialog(self.log_history, self.current_theme, self)
+            self.log_dialog = LogDialog(self.log_history, self.current_theme, self, max_lines=MAX_LOG_LINES)
             self.log_dialog.finished.connect(self.on_log_dialog_finished)
             self.log_dialog.log_cleared.connect(self.on_log_cleared)
         self.log_dialog.show()
@@ -359,14 +607,128 @@ class MainWindow(QMainWindow):
             save_config(self.config)
             self.populate_favorites_dropdown()
 
+    def show_schedule_dialog(self):
+        dialog = ScheduleDialog(self.schedules, self.favorites, ["Source Quality", *QUALITY_PRESETS], self.current_theme, self)
+        if dialog.exec():
+            self.schedules = dialog.schedules
+            self.config["schedules"] = self.schedules
+            save_config(self.config)
+            self.update_schedules_button()
+
+    def update_schedules_button(self):
+        upcoming = next_start(self.schedules, datetime.datetime.now())
+        if upcoming:
+            start, schedule = upcoming
+            self.schedules_button.setToolTip(f"Next: '{schedule['name']}' on {start:%a %H:%M}.")
+        else:
+            self.schedules_button.setToolTip("Start and stop streams automatically at set times.")
+
+    def check_schedules(self):
+        now = datetime.datetime.now()
+        for kind, schedule in due_events(self.schedules, self.last_schedule_check, now):
+            if kind == "prepare":
+                self.prepare_scheduled_stream(schedule)
+            elif kind == "start":
+                self.start_scheduled_stream(schedule)
+            else:
+                self.stop_scheduled_stream(schedule)
+        self.last_schedule_check = now
+
+    def prepare_scheduled_stream(self, schedule):
+        extra_presets = [extra["quality_preset"] for extra in self.get_extra_outputs()]
+        vcodec = "h264_v4l2m2m" if self.rpi_checkbox.isChecked() else "libx264"
+        self.stream_preparer.prepare(schedule, vcodec, extra_presets)
+        try:
+            # Renders the overlay images now so start_streaming finds them cached
+            prepare_overlays(self.get_overlay_config(), self.current_theme,
+                             top_stage_size([schedule["quality_preset"], *extra_presets], schedule["live_story"]))
+        except (ValueError, OSError) as e:
+            self.log_message(f"[WARNING] '{schedule['name']}': failed to prepare overlays: {e}")
+
+    def on_stream_prepared(self, name, result):
+        self.prepared_sources[name] = result
+
+    def start_scheduled_stream(self, schedule):
+        name = schedule["name"]
+        if self.stream_thread:
+            self.log_message(f"[WARNING] Scheduled stream '{name}' skipped: another stream is running.")
+            return
+        favorite_index = self.favorite_server_select.findText(schedule["favorite"])
+        if favorite_index == -1:
+            self.log_message(f"[ERROR] Scheduled stream '{name}': favorite server '{schedule['favorite']}' not found.")
+            return
+        self.log_message(f"Starting scheduled stream '{name}'.")
+        self.favorite_server_select.setCurrentIndex(favorite_index)
+        if schedule["source"].startswith("http"):
+            self.video_path_input.clear()
+            self.youtube_url_input.setText(schedule["source"])
+        else:
+            self.youtube_url_input.clear()
+            self.video_path_input.setText(schedule["source"])
+        self.quality_preset_select.setCurrentText(schedule["quality_preset"])
+        self.loop_mode_select.setCurrentText(schedule["loop_mode"])
+        self.live_story_checkbox.setChecked(schedule["live_story"])
+        self.pending_prepared = self.prepared_sources.pop(name, None)
+        self.start_streaming(scheduled=True)
+        if self.stream_thread:
+            self.scheduled_stream = name
+        self.update_schedules_button()
+
+    def stop_scheduled_stream(self, schedule):
+        if self.scheduled_stream == schedule["name"] and self.streamer:
+            self.log_message(f"Stopping scheduled stream '{schedule['name']}'.")
+            self.stop_streaming()
+
+    def take_prepared_source(self, stream_source):
+        """YouTube URL resolved ahead of time for this source, if still fresh."""
+        prepared = self.pending_prepared
+        self.pending_prepared = None
+        if (prepared and prepared["source"] == stream_source
+                and time.monotonic() - prepared["prepared_at"] < PREPARED_MAX_AGE_SECONDS):
+            return prepared["resolved"]
+        return None
+
+    def show_renditions_dialog(self):
+        dialog = RenditionsDialog(self.renditions, self.favorites, ["Source Quality", *QUALITY_PRESETS], self.current_theme, self)
+        if dialog.exec():
+            self.renditions = dialog.renditions
+            self.config["renditions"] = self.renditions
+            save_config(self.config)
+            self.update_simulcast_label()
+
+    def update_simulcast_label(self):
+        if self.renditions:
+            self.simulcast_label.setText(f"Extra Renditions: {len(self.renditions)}")
+        else:
+            self.simulcast_label.setText("Extra Renditions: none")
+
+    def get_extra_outputs(self):
+        extra_outputs = []
+        favorites_by_name = {fav["name"]: fav for fav in self.favorites}
+        for rendition in self.renditions:
+            favorite = favorites_by_name.get(rendition["favorite"])
+            if not favorite:
+                self.log_message(f"[WARNING] Skipping rendition for missing favorite '{rendition['favorite']}'.")
+                continue
+            extra_outputs.append({
+                "name": favorite["name"],
+                "server_url": favorite["url"],
+                "stream_key": favorite["key"],
+                "quality_preset": rendition["quality_preset"]
+            })
+        return extra_outputs
+
     def log_message(self, message):
         self.log_history.append(message)
         if self.log_dialog:
             self.log_dialog.add_log_message(message)
 
-    def start_streaming(self, from_loop=False):
+    def start_streaming(self, from_loop=False, scheduled=False):
+        trace = StartupTrace("loop" if from_loop else "start")
+        trace.begin("ui_validate")
         if not from_loop:
             self.user_stopped_stream = False
+            self.scheduled_stream = None
             video_path = self.video_path_input.text()
             youtube_url = self.youtube_url_input.text()
             server_url = self.server_url_input.text()
@@ -375,19 +737,59 @@ class MainWindow(QMainWindow):
             loop_mode = self.loop_mode_select.currentText()
             quality_preset = self.quality_preset_select.currentText()
             is_live_story = self.live_story_checkbox.isChecked()
+            cpu_budget_config = self.get_cpu_budget()
+            use_cache = self.cache_checkbox.isChecked()
+            archive_config = self.get_archive_config()
+            overlay_config = self.get_overlay_config()
+            watchdog_config = {
+                "enabled": self.watchdog_checkbox.isChecked(),
+                "stall_seconds": self.watchdog_timeout_spin.value()
+            }
 
             self.config["live_story"] = is_live_story
+            self.config["cpu_budget"] = cpu_budget_config
+            self.config["archive"] = archive_config
+            self.config["watchdog"] = watchdog_config
+            self.config["overlays"] = overlay_config
+            self.config["trace_startup"] = self.trace_checkbox.isChecked()
+            self.config["preview"] = {
+                "enabled": self.preview_checkbox.isChecked(),
+                "interval_seconds": self.preview_interval_spin.value()
+            }
+            cache_config = {**DEFAULT_YOUTUBE_CACHE, **self.config.get("youtube_cache", {})}
+            cache_config["enabled"] = use_cache
+            cache_config["max_size_gb"] = self.cache_size_spin.value()
+            self.config["youtube_cache"] = cache_config
+            self.youtube_cache.configure(cache_config["directory"], cache_config["max_size_gb"])
             save_config(self.config)
 
             if not (video_path or youtube_url) or not server_url or not stream_key:
-                QMessageBox.critical(self, "Error", "Server URL and stream key are required, plus a video path or YouTube URL.")
+                self.show_start_error("Server URL and stream key are required, plus a video path or YouTube URL.", scheduled)
+                return
+
+            try:
+                parse_cpu_list(cpu_budget_config["affinity"])
+            except ValueError:
+                self.show_start_error(f"Invalid CPU core list: {cpu_budget_config['affinity']}", scheduled)
                 return
             
             if video_path and not os.path.exists(video_path):
-                QMessageBox.critical(self, "Error", f"File not found: {video_path}")
+                self.show_start_error(f"File not found: {video_path}", scheduled)
                 return
 
             stream_source = video_path if video_path else youtube_url
+            extra_outputs = self.get_extra_outputs()
+
+            try:
+                output_presets = [quality_preset] + [extra["quality_preset"] for extra in extra_outputs]
+                overlays = prepare_overlays(overlay_config, self.current_theme, top_stage_size(output_presets, is_live_story))
+            except (ValueError, OSError) as e:
+                self.show_start_error(f"Failed to prepare overlays: {e}", scheduled)
+                return
+
+            start_position = 0
+            if video_path and loop_mode == "Play Once":
+                start_position = self.ask_resume_position(video_path, scheduled)
             
             self.last_stream_info = {
                 "source": stream_source,
@@ -396,7 +798,16 @@ class MainWindow(QMainWindow):
                 "is_rpi": is_rpi,
                 "loop_mode": loop_mode,
                 "quality_preset": quality_preset,
-                "is_live_story": is_live_story
+                "is_live_story": is_live_story,
+                "cpu_budget": cpu_budget_config,
+                "use_cache": use_cache,
+                "archive": archive_config,
+                "extra_outputs": extra_outputs,
+                "watchdog": watchdog_config,
+                "overlays": overlays,
+                "resolved_source": self.take_prepared_source(stream_source),
+                "start_position": start_position,
+                "preview": {"path": self.preview_path, **self.config["preview"]} if self.preview_checkbox.isChecked() else None
             }
 
             selected_favorite = self.favorite_server_select.currentData()
@@ -406,6 +817,7 @@ class MainWindow(QMainWindow):
                 self.config.pop("last_favorite_name", None)
             save_config(self.config)
 
+        trace.end("ui_validate")
         self.start_button.setEnabled(False)
 
         # Use stored info for re-looping
@@ -417,43 +829,145 @@ class MainWindow(QMainWindow):
         self.streamer.log_message.connect(self.log_message)
         self.streamer.stream_started.connect(self.on_stream_started)
         self.streamer.stream_stopped.connect(self.on_stream_stopped)
-        self.streamer.stream_stopped.connect(self.stream_thread.quit)
+        self.streamer.stall_detected.connect(self.on_stall_detected)
+        self.streamer.trace_finished.connect(self.on_trace_finished)
+        self.streamer.position_checkpoint.connect(self.on_position_checkpoint)
+        # QThread.quit is thread-safe; a direct call lets closeEvent wait on the thread
+        self.streamer.stream_stopped.connect(self.stream_thread.quit, Qt.ConnectionType.DirectConnection)
         
         self.streamer.moveToThread(self.stream_thread)
-        self.stream_thread.started.connect(lambda: self.streamer.start_streaming(
-            info["source"], info["server_url"], info["stream_key"], 
-            info["is_rpi"], info["loop_mode"], info["quality_preset"],
-            info["is_live_story"]
-        ))
+        self.streamer.stream_args = {
+            "stream_source": info["source"], "server_url": info["server_url"], "stream_key": info["stream_key"],
+            "is_rpi": info["is_rpi"], "loop_mode": info["loop_mode"], "quality_preset": info["quality_preset"],
+            "is_live_story": info["is_live_story"], "cpu_budget_config": info["cpu_budget"],
+            "youtube_cache": self.youtube_cache if info["use_cache"] else None,
+            "archive_config": info["archive"], "extra_outputs": info["extra_outputs"],
+            "watchdog_config": info["watchdog"], "overlays": info["overlays"],
+            # Only the first start uses the prepared URL; loops resolve it again
+            "resolved_source": info.pop("resolved_source", None),
+            "start_position": info.pop("start_position", 0), "preview": info["preview"], "trace": trace,
+        }
+        # A bound slot (not a lambda) so start_streaming runs in the stream thread
+        self.stream_thread.started.connect(self.streamer.run)
         
         self.stream_thread.finished.connect(self.on_thread_finished)
         self.stream_thread.finished.connect(self.streamer.deleteLater)
         self.stream_thread.finished.connect(self.stream_thread.deleteLater)
         
+        trace.begin("thread_start")
         self.stream_thread.start()
 
+    def show_start_error(self, message, scheduled):
+        # Nobody may be at the computer for a scheduled start; a modal box would sit there unseen
+        if scheduled:
+            self.log_message(f"[ERROR] {message}")
+        else:
+            QMessageBox.critical(self, "Error", message)
+
+    def ask_resume_position(self, video_path, scheduled):
+        """Offers to continue a file whose last stream ended abnormally."""
+        try:
+            key = checkpoint_key(video_path)
+        except OSError:
+            return 0
+        position = resume_position(self.config.get("resume_positions", {}).get(key))
+        if not position:
+            return 0
+        # Scheduled streams air the program from the start
+        if not scheduled:
+            answer = QMessageBox.question(
+                self, "Resume Stream",
+                f"The last stream of this file stopped unexpectedly at {format_duration(position)}.\n"
+                "Resume from there? Choose No to start from the beginning.")
+            if answer == QMessageBox.StandardButton.Yes:
+                return position
+        self.on_position_checkpoint(key, None)
+        return 0
+
+    def on_position_checkpoint(self, key, position):
+        positions = prune(self.config.get("resume_positions", {}))
+        if position is None:
+            positions.pop(key, None)
+        else:
+            positions[key] = position
+        self.config["resume_positions"] = positions
+        save_config(self.config)
+
     def stop_streaming(self):
         self.user_stopped_stream = True
+        self.scheduled_stream = None
         if self.streamer:
             self.stop_button.setEnabled(False)
-            self.streamer.stop_streaming()
+            # Runs in the streamer's thread, which owns the ffmpeg process
+            QMetaObject.invokeMethod(self.streamer, "stop_streaming", Qt.ConnectionType.QueuedConnection)
 
     def on_stream_started(self):
         self.stop_button.setEnabled(True)
+        if self.last_stream_info.get("preview"):
+            self.preview_timer.start(PREVIEW_POLL_MS)
+
+    def refresh_preview(self):
+        # ffmpeg rewrites the file once per interval; only load it when it changed
+        try:
+            mtime = os.stat(self.preview_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self.preview_mtime:
+            return
+        image = QImage(self.preview_path)
+        if image.isNull():
+            return
+        self.preview_mtime = mtime
+        self.preview_label.setPixmap(QPixmap.fromImage(image).scaled(
+            self.preview_label.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+
+    def clear_preview(self):
+        self.preview_timer.stop()
+        self.preview_mtime = None
+        self.preview_label.clear()
+        self.preview_label.setText("No preview")
+        try:
+            os.remove(self.preview_path)
+        except OSError:
+            pass
 
     def on_stream_stopped(self):
         # This is called when the process inside the thread stops.
         # The thread itself is still finishing.
         pass
 
+    def on_stall_detected(self, source, server_url):
+        stall_counts = self.config.setdefault("stall_counts", {})
+        source_counts = stall_counts.setdefault("sources", {})
+        server_counts = stall_counts.setdefault("servers", {})
+        source_counts[source] = source_counts.get(source, 0) + 1
+        server_counts[server_url] = server_counts.get(server_url, 0) + 1
+        save_config(self.config)
+        self.log_message(f"Stall count: {source_counts[source]} for this source, {server_counts[server_url]} for {server_url}.")
+
+    def on_trace_finished(self, trace):
+        if not self.trace_checkbox.isChecked():
+            return
+        try:
+            path = trace.export()
+            self.log_message(f"Startup trace saved to {path}")
+        except OSError as e:
+            self.log_message(f"[WARNING] Failed to save startup trace: {e}")
+
     def on_thread_finished(self):
+        # finished() is emitted before the thread has fully exited; dropping
+        # the last reference to the streamer before that can deadlock
+        self.stream_thread.wait()
+        self.clear_preview()
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
+        # The watchdog already retried; re-looping would just start over
+        gave_up = self.streamer.gave_up
         self.streamer = None
         self.stream_thread = None
 
         # Re-looping logic
-        if not self.user_stopped_stream and self.last_stream_info:
+        if not self.user_stopped_stream and not gave_up and self.last_stream_info:
             is_youtube = self.last_stream_info["source"].startswith("http")
             if is_youtube and self.last_stream_info["loop_mode"] == "Loop Infinitely":
                 self.log_message("Re-looping YouTube stream...")
@@ -461,4 +975,7 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         self.stop_streaming()
+        if self.stream_thread:
+            self.stream_thread.wait(7000)
+        self.clear_preview()
         super().closeEvent(event)
\ No newline at end of file
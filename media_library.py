@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+DEFAULT_LIBRARY_DIR = str(Path.home() / ".cache" / "telestream" / "library")
+
+DEFAULT_LIBRARY = {
+    "directories": []
+}
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov")
+
+# ffprobe and ffmpeg run as separate processes, so threads are enough to keep
+# them busy. Each thumbnail is a full ffmpeg decode and scans can run during
+# a live stream, so only a couple run at once
+PROBE_WORKERS = min(2, os.cpu_count() or 1)
+PROBE_TIMEOUT = 30
+THUMBNAIL_WIDTH = 160
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    duration REAL,
+    width INTEGER,
+    height INTEGER,
+    vcodec TEXT,
+    acodec TEXT,
+    thumbnail TEXT,
+    error TEXT
+)
+"""
+
+
+def find_videos(directories: list) -> dict:
+    """Retorna {caminho: (mtime, tamanho)} dos vídeos dentro dos diretórios."""
+    found = {}
+    for directory in directories:
+        for root, __, files in os.walk(directory):
+            for name in files:
+                if not name.lower().endswith(VIDEO_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found[path] = (stat.st_mtime, stat.st_size)
+    return found
+
+
+def probe(path: str) -> dict:
+    """Lê duração, resolução e codecs com o ffprobe."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path],
+        capture_output=True, text=True, timeout=PROBE_TIMEOUT
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"ffprobe exited with code {result.returncode}")
+    info = json.loads(result.stdout)
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+    duration = info.get("format", {}).get("duration")
+    return {
+        "duration": float(duration) if duration else None,
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "vcodec": video.get("codec_name"),
+        "acodec": audio.get("codec_name"),
+    }
+
+
+def make_thumbnail(path: str, duration, thumbnail_path: str) -> bool:
+    """Extrai um quadro a 10% do vídeo (no máximo 30 s) como JPEG pequeno."""
+    position = min(duration * 0.1, 30) if duration else 0
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-y", "-ss", f"{position:.2f}", "-i", path,
+         "-frames:v", "1", "-vf", f"scale={THUMBNAIL_WIDTH}:-2", "-q:v", "5", thumbnail_path],
+        capture_output=True, timeout=PROBE_TIMEOUT
+    )
+    return result.returncode == 0 and os.path.exists(thumbnail_path)
+
+
+def index_file(path: str, thumbnail_dir: str) -> dict:
+    """Sonda um arquivo e gera a miniatura; erros ficam registrados na entrada."""
+    entry = {"duration": None, "width": None, "height": None, "vcodec": None, "acodec": None,
+             "thumbnail": None, "error": None}
+    try:
+        entry.update(probe(path))
+        if entry["vcodec"]:
+            thumbnail_path = os.path.join(thumbnail_dir, hashlib.sha1(path.encode("utf-8")).hexdigest() + ".jpg")
+            if make_thumbnail(path, entry["duration"], thumbnail_path):
+                entry["thumbnail"] = thumbnail_path
+    except (OSError, ValueError, RuntimeError, subprocess.TimeoutExpired) as e:
+        entry["error"] = str(e)
+    return entry
+
+
+class MediaLibrary(QObject):
+    """Índice SQLite dos vídeos das pastas configuradas.
+
+    Uma nova varredura só sonda arquivos novos ou com mtime/tamanho
+    diferentes do índice, então repetir a varredura de milhares de
+    arquivos custa pouco mais que listar os diretórios.
+    """
+    log_message = pyqtSignal(str)
+    scan_progress = pyqtSignal(int, int)
+    scan_finished = pyqtSignal()
+
+    def __init__(self, directory: str = ""):
+        super().__init__()
+        self.directory = directory or DEFAULT_LIBRARY_DIR
+        self.db_path = os.path.join(self.directory, "library.sqlite3")
+        self.thumbnail_dir = os.path.join(self.directory, "thumbnails")
+        self.scanning = False
+        self.lock = threading.Lock()
+
+    def connect_db(self) -> sqlite3.Connection:
+        # One connection per call: scans run in a background thread
+        os.makedirs(self.thumbnail_dir, exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        connection.row_factory = sqlite3.Row
+        connection.execute(SCHEMA)
+        return connection
+
+    def entries(self, search: str = "") -> list:
+        """Vídeos indexados, filtrados por trecho do caminho."""
+        # % and _ in the search are literal characters, not wildcards
+        pattern = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        connection = self.connect_db()
+        try:
+            return [dict(row) for row in connection.execute(
+                "SELECT * FROM media WHERE path LIKE ? ESCAPE '\\' ORDER BY path", (f"%{pattern}%",))]
+        finally:
+            connection.close()
+
+    def rescan(self, directories: list) -> bool:
+        """Atualiza o índice em segundo plano. Retorna False se já houver uma varredura."""
+        with self.lock:
+            if self.scanning:
+                return False
+            self.scanning = True
+        threading.Thread(target=self._scan, args=(list(directories),), daemon=True).start()
+        return True
+
+    def _scan(self, directories: list):
+        started = time.monotonic()
+        try:
+            found = find_videos(directories)
+            connection = self.connect_db()
+            try:
+                known = {row["path"]: (row["mtime"], row["size"], row["thumbnail"])
+                         for row in connection.execute("SELECT path, mtime, size, thumbnail FROM media")}
+                removed = [path for path in known if path not in found]
+                changed = [path for path, stat in found.items() if known.get(path, (None, None))[:2] != stat]
+
+                # Files no longer in the configured folders
+                connection.executemany("DELETE FROM media WHERE path = ?", [(path,) for path in removed])
+                connection.commit()
+                for path in removed:
+                    if known[path][2]:
+                        try:
+                            os.remove(known[path][2])
+                        except OSError:
+                            pass
+
+                done = 0
+                self.scan_progress.emit(done, len(changed))
+                with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+                    for path, entry in zip(changed, pool.map(index_file, changed, [self.thumbnail_dir] * len(changed))):
+                        mtime, size = found[path]
+                        connection.execute(
+                            "INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (path, mtime, size, entry["duration"], entry["width"], entry["height"],
+                             entry["vcodec"], entry["acodec"], entry["thumbnail"], entry["error"]))
+                        done += 1
+                        if done % 50 == 0:
+                            connection.commit()
+                            self.scan_progress.emit(done, len(changed))
+                connection.commit()
+                self.scan_progress.emit(done, len(changed))
+            finally:
+                connection.close()
+            self.log_message.emit(
+                f"Library scan: {len(found)} videos, {len(changed)} probed, {len(removed)} removed "
+                f"in {time.monotonic() - started:.1f}s.")
+        except (OSError, sqlite3.Error) as e:
+            self.log_message.emit(f"[ERROR] Library scan failed: {e}")
+        finally:
+            with self.lock:
+                self.scanning = False
+            self.scan_finished.emit()
+
+
+def format_duration(seconds) -> str:
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
@@ -0,0 +1,164 @@
+import os
+import hashlib
+from pathlib import Path
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QColor, QFont, QFontMetricsF, QImage, QPainter
+
+DEFAULT_OVERLAY_DIR = str(Path.home() / ".cache" / "telestream" / "overlays")
+
+DEFAULT_OVERLAYS = {
+    "enabled": False,
+    "logo_path": "",
+    "logo_position": "top-right",
+    "text": "LIVE",
+    "text_position": "top-left",
+    "font": "Sans Serif",
+    "font_size": 36
+}
+
+# Sizes are given for a frame whose shorter side is 1080 pixels
+REFERENCE_SIZE = 1080
+LOGO_HEIGHT = 96
+MARGIN = 24
+
+POSITIONS = {
+    "top-left": ("{m}", "{m}"),
+    "top-right": ("W-w-{m}", "{m}"),
+    "bottom-left": ("{m}", "H-h-{m}"),
+    "bottom-right": ("W-w-{m}", "H-h-{m}"),
+}
+
+# Badge background and text colors for each theme
+BADGE_COLORS = {
+    "dark": ("#d32f2f", "#ffffff"),
+    "light": ("#ffffff", "#d32f2f"),
+}
+
+_rendered = {}
+
+
+def _cached_png(key: tuple, render, directory: str) -> str:
+    """Renderiza a imagem uma única vez por chave e a guarda como PNG no disco."""
+    path = _rendered.get(key)
+    if path and os.path.exists(path):
+        return path
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(directory, f"{key[0]}-{digest}.png")
+    if not os.path.exists(path):
+        image = render()
+        os.makedirs(directory, exist_ok=True)
+        partial = path + ".partial.png"
+        if not image.save(partial, "PNG"):
+            raise OSError(f"Failed to write {partial}")
+        os.replace(partial, path)
+    _rendered[key] = path
+    return path
+
+
+def render_badge(text: str, font_family: str, font_size: int, theme_name: str) -> QImage:
+    """Desenha o texto em um selo arredondado sobre fundo transparente (RGBA)."""
+    font = QFont(font_family)
+    font.setPixelSize(font_size)
+    font.setBold(True)
+    metrics = QFontMetricsF(font)
+    padding = font_size * 0.4
+    width = metrics.horizontalAdvance(text) + 2 * padding
+    height = metrics.height() + padding
+    background, foreground = BADGE_COLORS.get(theme_name, BADGE_COLORS["dark"])
+
+    image = QImage(int(width + 0.5), int(height + 0.5), QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QColor(background))
+    rect = QRectF(0, 0, image.width(), image.height())
+    painter.drawRoundedRect(rect, height * 0.2, height * 0.2)
+    painter.setFont(font)
+    painter.setPen(QColor(foreground))
+    painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+    painter.end()
+    return image
+
+
+def render_logo(path: str, height: int) -> QImage:
+    """Carrega o logotipo já redimensionado para a altura final."""
+    image = QImage(path)
+    if image.isNull():
+        raise ValueError(f"Could not read logo image: {path}")
+    return image.scaledToHeight(height, Qt.TransformationMode.SmoothTransformation).convertToFormat(
+        QImage.Format.Format_ARGB32_Premultiplied)
+
+
+def _placement(position: str, scale: float) -> dict:
+    x, y = POSITIONS.get(position, POSITIONS["top-left"])
+    margin = round(MARGIN * scale)
+    return {"x": x.format(m=margin), "y": y.format(m=margin)}
+
+
+def prepare_overlays(overlay_config: dict, theme_name: str, frame_size=None, directory: str = None) -> list:
+    """Gera (ou reaproveita do cache) as imagens das sobreposições.
+
+    frame_size é o tamanho da primeira etapa do filtergraph, onde as
+    imagens são aplicadas; None (resolução de origem) usa 1080p como
+    referência. Retorna uma lista de {"path", "x", "y"} na ordem em que
+    as imagens devem ser passadas ao ffmpeg. Lança ValueError se o
+    logotipo não puder ser lido.
+    """
+    config = {**DEFAULT_OVERLAYS, **(overlay_config or {})}
+    if not config["enabled"]:
+        return []
+    directory = directory or DEFAULT_OVERLAY_DIR
+    scale = min(frame_size) / REFERENCE_SIZE if frame_size else 1.0
+    overlays = []
+
+    logo_path = config["logo_path"]
+    if logo_path:
+        if not os.path.isfile(logo_path):
+            raise ValueError(f"Logo file not found: {logo_path}")
+        height = max(1, round(LOGO_HEIGHT * scale))
+        key = ("logo", os.path.abspath(logo_path), os.path.getmtime(logo_path), height)
+        path = _cached_png(key, lambda: render_logo(logo_path, height), directory)
+        overlays.append({"path": path, **_placement(config["logo_position"], scale)})
+
+    text = config["text"].strip()
+    if text:
+        font_size = max(1, round(config["font_size"] * scale))
+        key = ("badge", text, config["font"], font_size, theme_name)
+        path = _cached_png(key, lambda: render_badge(text, config["font"], font_size, theme_name), directory)
+        overlays.append({"path": path, **_placement(config["text_position"], scale)})
+    return overlays
+
+
+def input_args(overlays: list) -> list:
+    """Entradas do ffmpeg: cada imagem é lida uma vez (um único quadro)."""
+    args = []
+    for overlay in overlays:
+        args.extend(["-i", overlay["path"]])
+    return args
+
+
+def overlay_chain(input_label: str, overlays: list, first_input: int, output_label: str) -> str:
+    """Compõe as imagens estáticas sobre input_label.
+
+    Com eof_action=repeat o filtro overlay reutiliza o único quadro de
+    cada imagem, então nada é renderizado ou decodificado a cada quadro.
+    """
+    chains = []
+    current = input_label
+    for index, overlay in enumerate(overlays):
+        label = output_label if index == len(overlays) - 1 else f"[ov{index}]"
+        chains.append(f"{current}[{first_input + index}:v]overlay=x={overlay['x']}:y={overlay['y']}:eof_action=repeat{label}")
+        current = label
+    return "; ".join(chains)
+
+
+def cost_report(base_cpu_seconds, overlay_cpu_seconds, media_seconds: float) -> str:
+    """Compara o custo da primeira etapa com e sem as sobreposições."""
+    if base_cpu_seconds is None or overlay_cpu_seconds is None:
+        return "Overlay cost: benchmark unavailable."
+    base = 100 * base_cpu_seconds / media_seconds
+    with_overlays = 100 * overlay_cpu_seconds / media_seconds
+    return (f"Overlay cost: {with_overlays - base:+.1f}% of a core "
+            f"({base:.1f}% without overlays, {with_overlays:.1f}% with).")
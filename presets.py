@@ -0,0 +1,46 @@
+QUALITY_PRESETS = {
+    "1080p (5 Mbps)": {"res": "1920x1080", "story_res": "1080x1920", "bitrate": "5M"},
+    "720p (3 Mbps)": {"res": "1280x720", "story_res": "720x1280", "bitrate": "3M"},
+    "480p (1.5 Mbps)": {"res": "854x480", "story_res": "480x854", "bitrate": "1.5M"},
+}
+
+# Live Story has no source-sized output, so "Source Quality" falls back to 1080p
+DEFAULT_STORY_PRESET = "1080p (5 Mbps)"
+
+
+def story_preset(quality_preset: str) -> dict:
+    return QUALITY_PRESETS.get(quality_preset, QUALITY_PRESETS[DEFAULT_STORY_PRESET])
+
+
+def output_size(quality_preset: str, is_live_story: bool = False):
+    """Retorna (largura, altura) da saída, ou None para a resolução de origem."""
+    if is_live_story:
+        res = story_preset(quality_preset)["story_res"]
+    elif quality_preset in QUALITY_PRESETS:
+        res = QUALITY_PRESETS[quality_preset]["res"]
+    else:
+        return None
+    width, height = map(int, res.split("x"))
+    return width, height
+
+
+def required_source_height(quality_preset: str, is_live_story: bool = False):
+    """Altura mínima de uma fonte 16:9 para preencher a saída sem ampliar.
+
+    No Live Story o vídeo é encaixado pela largura, então uma saída de
+    1080x1920 precisa de uma fonte com 1080 pixels de largura (608p).
+    Retorna None para "Source Quality".
+    """
+    size = output_size(quality_preset, is_live_story)
+    if size is None:
+        return None
+    width, height = size
+    if is_live_story:
+        return -(-width * 9 // 16)
+    return height
+
+
+def source_target_height(quality_presets: list, is_live_story: bool = False):
+    """Altura de fonte que atende a todas as saídas, ou None se alguma usa a resolução de origem."""
+    heights = [required_source_height(p, is_live_story) for p in quality_presets]
+    return None if None in heights else max(heights)
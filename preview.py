@@ -0,0 +1,56 @@
+import os
+import tempfile
+import subprocess
+from functools import lru_cache
+
+DEFAULT_PREVIEW = {
+    "enabled": False,
+    "interval_seconds": 5
+}
+
+PREVIEW_WIDTH = 160
+# Output label of the preview branch in the filtergraph
+PREVIEW_LABEL = "[preview]"
+
+
+def preview_path() -> str:
+    """Arquivo temporário onde o ffmpeg grava o quadro de prévia."""
+    return os.path.join(tempfile.gettempdir(), f"telestream-preview-{os.getpid()}.jpg")
+
+
+def preview_filter(interval_seconds: int) -> str:
+    """Reduz a ramificação a um quadro a cada intervalo antes de redimensionar.
+
+    O fps descarta os quadros intermediários sem processá-los, então a
+    escala e a codificação JPEG rodam só uma vez por intervalo.
+    """
+    return f"fps=1/{interval_seconds},scale={PREVIEW_WIDTH}:-2"
+
+
+@lru_cache(maxsize=None)
+def supports_atomic_writing() -> bool:
+    """Verifica (uma vez por processo) se o muxer image2 tem atomic_writing."""
+    try:
+        result = subprocess.run(["ffmpeg", "-hide_banner", "-h", "muxer=image2"],
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return "atomic_writing" in result.stdout
+
+
+def output_args(path: str) -> list:
+    """Saída extra do ffmpeg que sobrescreve sempre o mesmo JPEG.
+
+    Com atomic_writing o quadro é gravado em um arquivo temporário e
+    renomeado, então quem lê nunca encontra um JPEG pela metade.
+    """
+    return [
+        "-map", PREVIEW_LABEL,
+        "-c:v", "mjpeg",
+        "-q:v", "5",
+        "-threads", "1",
+        "-f", "image2",
+        "-update", "1",
+        "-atomic_writing", "1",
+        path,
+    ]
@@ -0,0 +1,150 @@
+import os
+import re
+import presets
+import overlays as overlay_filters
+from preview import PREVIEW_LABEL
+
+BENCHMARK_SECONDS = 10
+
+# Successful benchmark results (CPU seconds) for this process, by
+# (source, filter graph, extra inputs): loops and restarts reuse them
+benchmark_results = {}
+
+
+def story_filter(input_label: str, width: int, height: int, output_label: str) -> str:
+    """Filtro 9:16 do Live Story com fundo desfocado."""
+    return (
+        f"{input_label}split=2[original][bg]; "
+        f"[bg]scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},boxblur=20[blurred_bg]; "
+        f"[original]scale={width}:{height}:force_original_aspect_ratio=decrease[fg]; "
+        f"[blurred_bg][fg]overlay=(W-w)/2:(H-h)/2{output_label}"
+    )
+
+
+def _size_order(size):
+    # Source size (None) first, then largest to smallest
+    return (0, 0) if size is None else (1, -size[0] * size[1])
+
+
+def top_stage_size(quality_presets: list, is_live_story: bool = False):
+    """Tamanho da primeira etapa do filtergraph, ou None para a resolução de origem."""
+    return sorted(set(presets.output_size(p, is_live_story) for p in quality_presets), key=_size_order)[0]
+
+
+def build_video_graph(quality_presets: list, is_live_story: bool = False, overlays: list = None, overlay_input: int = 1, preview_filter: str = None):
+    """Monta um único filtergraph que decodifica a fonte uma vez para todas as saídas.
+
+    A primeira etapa (Live Story ou a maior escala) é feita uma vez e as
+    resoluções menores são geradas em cascata a partir da anterior. As
+    sobreposições, passadas como entradas a partir de overlay_input, são
+    compostas nessa primeira etapa e herdadas por todas as saídas. Com
+    preview_filter, uma ramificação da última (menor) etapa passa por
+    esse filtro e sai em PREVIEW_LABEL, sem uma segunda decodificação.
+    Retorna (filter_complex, labels), onde labels[i] é o argumento de -map
+    do vídeo da saída i. filter_complex é None quando a única saída usa a
+    fonte sem filtros.
+    """
+    sizes = [presets.output_size(p, is_live_story) for p in quality_presets]
+    distinct = sorted(set(sizes), key=_size_order)
+    if distinct == [None] and len(sizes) == 1 and not overlays and not preview_filter:
+        return None, ["0:v:0"]
+
+    chains = []
+    labels = [None] * len(sizes)
+    current = "[0:v]"
+    for index, size in enumerate(distinct):
+        stage = f"[r{index}]"
+        if is_live_story and index == 0:
+            chains.append(story_filter(current, size[0], size[1], stage))
+        elif size is not None:
+            chains.append(f"{current}scale={size[0]}:{size[1]}{stage}")
+        else:
+            stage = current
+        if overlays and index == 0:
+            chains.append(overlay_filters.overlay_chain(stage, overlays, overlay_input, "[ov]"))
+            stage = "[ov]"
+
+        consumers = [i for i, s in enumerate(sizes) if s == size]
+        has_next = index + 1 < len(distinct)
+        has_preview = bool(preview_filter) and not has_next
+        outputs = [f"[r{index}o{n}]" for n in range(len(consumers) + has_next + has_preview)]
+        if len(outputs) == 1:
+            outputs = [stage]
+        else:
+            chains.append(f"{stage}split={len(outputs)}{''.join(outputs)}")
+        for output_index, label in zip(consumers, outputs):
+            labels[output_index] = label
+        if has_next:
+            current = outputs[-1]
+        elif has_preview:
+            chains.append(f"{outputs[-1]}{preview_filter}{PREVIEW_LABEL}")
+    return "; ".join(chains), labels
+
+
+def shared_stage_graph(quality_presets: list, is_live_story: bool = False, overlays: list = None) -> str:
+    """Filtro da etapa compartilhada (a que se repetiria em cada instância separada).
+
+    Com overlays, as imagens devem ser as entradas seguintes à fonte.
+    """
+    top = top_stage_size(quality_presets, is_live_story)
+    output_label = "[top]" if overlays else ""
+    if is_live_story:
+        stage = story_filter("[0:v]", top[0], top[1], output_label)
+    elif top is None:
+        stage = f"[0:v]null{output_label}"
+    else:
+        stage = f"[0:v]scale={top[0]}:{top[1]}{output_label}"
+    if not overlays:
+        return stage
+    return f"{stage}; {overlay_filters.overlay_chain('[top]', overlays, 1, '')}"
+
+
+def benchmark_args(input_source: str, shared_filter: str, extra_inputs: list = None) -> list:
+    """Argumentos do ffmpeg para medir o custo de decodificar e filtrar a fonte."""
+    args = [
+        "-hide_banner", "-nostats", "-benchmark",
+        "-t", str(BENCHMARK_SECONDS),
+        "-i", input_source,
+    ]
+    for path in extra_inputs or []:
+        args.extend(["-i", path])
+    args.extend([
+        "-filter_complex", shared_filter,
+        "-f", "null", "-",
+    ])
+    return args
+
+
+def parse_benchmark(output: str):
+    """Extrai o tempo de CPU (utime + stime, em segundos) da saída do -benchmark."""
+    match = re.search(r"bench: utime=([\d.]+)s stime=([\d.]+)s", output)
+    if not match:
+        return None
+    return float(match.group(1)) + float(match.group(2))
+
+
+def process_cpu_seconds(pid: int):
+    """Tempo de CPU consumido por um processo, ou None se indisponível (não-Linux)."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    # utime and stime are fields 14 and 15; the split above starts at field 3
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def cpu_report(count: int, cpu_seconds: float, wall_seconds: float, shared_cpu_per_second) -> str:
+    """Compara o uso de CPU do simulcast com o de instâncias separadas.
+
+    Cada instância separada repetiria a decodificação e a etapa
+    compartilhada, medidas pelo benchmark em shared_cpu_per_second.
+    """
+    used = 100 * cpu_seconds / wall_seconds if wall_seconds > 0 else 0
+    report = f"Simulcast CPU: {count} renditions used {used:.0f}% of a core"
+    if shared_cpu_per_second is None:
+        return report + " (shared-stage benchmark unavailable)."
+    extra = 100 * shared_cpu_per_second * (count - 1)
+    saved_share = 100 * extra / (used + extra) if used + extra else 0
+    return (f"{report}; separate instances would need about {extra:.0f}% of a core more "
+            f"for {count - 1} extra decode(s) ({saved_share:.0f}% saved).")
@@ -0,0 +1,69 @@
+import os
+import sys
+from PyQt6.QtCore import QBuffer, QByteArray, QSize
+from PyQt6.QtGui import QIcon, QImageReader, QPixmap, QGuiApplication
+
+DEFAULT_ICON_SIZE = 32
+
+_bundle = None
+_icon_cache = {}
+
+
+def base_path() -> str:
+    if getattr(sys, 'frozen', False):
+        return sys._MEIPASS
+    return os.path.dirname(__file__)
+
+
+def load_bundle() -> dict:
+    """Lê todos os temas e ícones para a memória uma única vez por processo.
+
+    Retorna {"qss": {tema: texto}, "icons": {(tema, nome): bytes SVG}}.
+    """
+    global _bundle
+    if _bundle is not None:
+        return _bundle
+    themes_dir = os.path.join(base_path(), "themes")
+    bundle = {"qss": {}, "icons": {}}
+    for entry in os.listdir(themes_dir):
+        if entry.endswith(".qss"):
+            with open(os.path.join(themes_dir, entry), "r") as f:
+                bundle["qss"][entry[:-len(".qss")]] = f.read()
+    icons_dir = os.path.join(themes_dir, "icons")
+    for theme_name in os.listdir(icons_dir):
+        theme_dir = os.path.join(icons_dir, theme_name)
+        for icon_name in os.listdir(theme_dir):
+            with open(os.path.join(theme_dir, icon_name), "rb") as f:
+                bundle["icons"][(theme_name, icon_name)] = f.read()
+    _bundle = bundle
+    return _bundle
+
+
+def stylesheet(theme_name: str):
+    """Retorna o QSS do tema, ou None se o tema não existir."""
+    return load_bundle()["qss"].get(theme_name)
+
+
+def icon(theme_name: str, icon_name: str, size: int = DEFAULT_ICON_SIZE) -> QIcon:
+    """Retorna o ícone renderizado, usando um cache por (tema, nome, tamanho)."""
+    key = (theme_name, icon_name, size)
+    cached = _icon_cache.get(key)
+    if cached is not None:
+        return cached
+
+    svg_data = load_bundle()["icons"].get((theme_name, icon_name))
+    if svg_data is None:
+        return QIcon()
+    screen = QGuiApplication.primaryScreen()
+    ratio = screen.devicePixelRatio() if screen else 1.0
+    buffer = QBuffer()
+    buffer.setData(QByteArray(svg_data))
+    buffer.open(QBuffer.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer, b"svg")
+    reader.setScaledSize(QSize(round(size * ratio), round(size * ratio)))
+    pixmap = QPixmap.fromImage(reader.read())
+    pixmap.setDevicePixelRatio(ratio)
+
+    rendered = QIcon(pixmap)
+    _icon_cache[key] = rendered
+    return rendered
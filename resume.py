@@ -0,0 +1,58 @@
+import os
+
+# Playback positions are saved to the config at most this often
+CHECKPOINT_SECONDS = 10
+# Resume a little before the checkpoint: the last encoded seconds may not
+# have reached the server before ffmpeg died
+REWIND_SECONDS = 3
+# Positions this close to the start are not worth resuming from
+MIN_RESUME_SECONDS = 15
+
+
+def checkpoint_key(path: str) -> str:
+    """Chave da posição salva: caminho absoluto e mtime do arquivo.
+
+    Se o arquivo for substituído, o mtime muda e a posição antiga deixa
+    de valer. Lança OSError se o arquivo não existir.
+    """
+    path = os.path.abspath(path)
+    return f"{path}|{int(os.path.getmtime(path))}"
+
+
+def progress_position(block: dict, offset: float):
+    """Posição na entrada (segundos) de um bloco de "-progress", ou None.
+
+    Com -ss antes de -i o out_time recomeça do zero, então a posição real
+    é o deslocamento da busca mais o out_time.
+    """
+    try:
+        return offset + int(block.get("out_time_us", "")) / 1_000_000
+    except ValueError:
+        return None
+
+
+def resume_position(position) -> float:
+    """Posição de onde retomar, ou 0 se for melhor começar do início."""
+    if not position or position < MIN_RESUME_SECONDS:
+        return 0
+    return max(0, position - REWIND_SECONDS)
+
+
+def seek_args(position: float) -> list:
+    """Busca rápida na entrada: vai à posição antes de decodificar."""
+    if not position:
+        return []
+    return ["-ss", f"{position:.3f}"]
+
+
+def prune(positions: dict) -> dict:
+    """Remove posições de arquivos que não existem mais ou foram alterados."""
+    kept = {}
+    for key, position in positions.items():
+        path = key.rpartition("|")[0]
+        try:
+            if checkpoint_key(path) == key:
+                kept[key] = position
+        except OSError:
+            pass
+    return kept
@@ -0,0 +1,164 @@
+import os
+import time
+import datetime
+import threading
+import subprocess
+from PyQt6.QtCore import QObject, pyqtSignal
+import presets
+import youtube
+from media_library import probe
+
+DEFAULT_SCHEDULE = {
+    "name": "",
+    "enabled": True,
+    "days": [0, 1, 2, 3, 4, 5, 6],
+    "start": "20:00",
+    "stop": "21:00",
+    "source": "",
+    "favorite": "",
+    "quality_preset": "Source Quality",
+    "loop_mode": "Loop Infinitely",
+    "live_story": False
+}
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Expensive preparation runs this long before the start time
+PREPARE_AHEAD_SECONDS = 120
+# Prepared YouTube URLs older than this are resolved again at start
+PREPARED_MAX_AGE_SECONDS = 30 * 60
+# Starts missed by more than this (e.g. the computer was asleep) are skipped;
+# a missed stop still stops the stream
+MISSED_GRACE_SECONDS = 60
+CHECK_INTERVAL_MS = 250
+# Bytes of a local file read ahead into the page cache
+WARM_BYTES = 64 * 1024 ** 2
+
+
+def parse_time(text: str) -> datetime.time:
+    """Converte "HH:MM" em datetime.time; lança ValueError se inválido."""
+    return datetime.datetime.strptime(text.strip(), "%H:%M").time()
+
+
+def has_valid_times(schedule: dict) -> bool:
+    """Indica se início e fim são horários "HH:MM" válidos.
+
+    O config.json pode ter sido editado à mão; agendamentos inválidos são
+    ignorados em vez de derrubar o timer de verificação.
+    """
+    try:
+        parse_time(schedule["start"])
+        parse_time(schedule["stop"])
+    except (KeyError, AttributeError, ValueError):
+        return False
+    return True
+
+
+def active_schedules(schedules: list) -> list:
+    """Agendamentos ativados e com horários válidos."""
+    return [schedule for schedule in schedules
+            if schedule.get("enabled", True) and has_valid_times(schedule)]
+
+
+def occurrences(schedule: dict, around: datetime.datetime) -> list:
+    """Retorna (preparo, início, fim) das ocorrências de ontem a amanhã.
+
+    Um horário de fim menor que o de início termina no dia seguinte.
+    """
+    start_time = parse_time(schedule["start"])
+    stop_time = parse_time(schedule["stop"])
+    duration = (datetime.datetime.combine(around.date(), stop_time)
+                - datetime.datetime.combine(around.date(), start_time)) % datetime.timedelta(days=1)
+    result = []
+    for offset in (-1, 0, 1):
+        day = around.date() + datetime.timedelta(days=offset)
+        if day.weekday() not in schedule["days"]:
+            continue
+        start = datetime.datetime.combine(day, start_time)
+        result.append((start - datetime.timedelta(seconds=PREPARE_AHEAD_SECONDS), start, start + duration))
+    return result
+
+
+def due_events(schedules: list, last_check: datetime.datetime, now: datetime.datetime) -> list:
+    """Eventos ("prepare", "start" ou "stop") com horário em (last_check, now].
+
+    Retorna uma lista de (tipo, agendamento) em ordem cronológica.
+    """
+    events = []
+    grace = datetime.timedelta(seconds=MISSED_GRACE_SECONDS)
+    for schedule in active_schedules(schedules):
+        for occurrence in occurrences(schedule, now):
+            for kind, moment in zip(("prepare", "start", "stop"), occurrence):
+                if last_check < moment <= now and (kind == "stop" or now - moment <= grace):
+                    events.append((moment, kind, schedule))
+    events.sort(key=lambda event: event[0])
+    return [(kind, schedule) for __, kind, schedule in events]
+
+
+def next_start(schedules: list, now: datetime.datetime):
+    """Próximo início entre os agendamentos ativos, como (datetime, agendamento), ou None."""
+    upcoming = []
+    for schedule in active_schedules(schedules):
+        for __, start, __ in occurrences(schedule, now):
+            if start > now:
+                upcoming.append((start, schedule))
+    return min(upcoming, key=lambda item: item[0], default=None)
+
+
+def validate_encoder(vcodec: str) -> str:
+    """Codifica alguns quadros sintéticos. Retorna a mensagem de erro ou "" se ok."""
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error",
+             "-f", "lavfi", "-i", "testsrc2=size=320x240:rate=30", "-frames:v", "10",
+             "-c:v", vcodec, "-f", "null", "-"],
+            capture_output=True, text=True, timeout=30
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return str(e)
+    if result.returncode != 0:
+        return result.stderr.strip() or f"ffmpeg exited with code {result.returncode}"
+    return ""
+
+
+def warm_file(path: str):
+    """Traz o início do arquivo para o cache de páginas do sistema."""
+    with open(path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, WARM_BYTES, os.POSIX_FADV_WILLNEED)
+        else:
+            remaining = WARM_BYTES
+            while remaining > 0 and f.read(min(remaining, 1024 ** 2)):
+                remaining -= 1024 ** 2
+
+
+class StreamPreparer(QObject):
+    """Faz em segundo plano o trabalho lento do início de uma transmissão agendada."""
+    log_message = pyqtSignal(str)
+    prepared = pyqtSignal(str, object)
+
+    def prepare(self, schedule: dict, vcodec: str, extra_presets: list):
+        threading.Thread(target=self._prepare, args=(dict(schedule), vcodec, list(extra_presets)), daemon=True).start()
+
+    def _prepare(self, schedule: dict, vcodec: str, extra_presets: list):
+        name = schedule["name"]
+        source = schedule["source"]
+        result = {"source": source, "resolved": None, "prepared_at": time.monotonic()}
+        started = time.monotonic()
+        self.log_message.emit(f"Preparing scheduled stream '{name}'...")
+        try:
+            if source.startswith("http"):
+                target_height = presets.source_target_height([schedule["quality_preset"]] + extra_presets, schedule["live_story"])
+                result["resolved"] = youtube.resolve_stream(source, target_height)
+                self.log_message.emit(f"'{name}': resolved {result['resolved']['description']}.")
+            else:
+                info = probe(source)
+                warm_file(source)
+                self.log_message.emit(f"'{name}': {info['width']}x{info['height']} {info['vcodec']} / {info['acodec']}, file cache warmed.")
+        except Exception as e:
+            self.log_message.emit(f"[WARNING] '{name}': failed to prepare the source: {e}")
+        error = validate_encoder(vcodec)
+        if error:
+            self.log_message.emit(f"[WARNING] '{name}': encoder {vcodec} failed a test encode: {error}")
+        self.log_message.emit(f"Scheduled stream '{name}' prepared in {time.monotonic() - started:.1f}s.")
+        self.prepared.emit(name, result)
@@ -0,0 +1,254 @@
+import os
+import sys
+import gc
+import time
+import stat
+import argparse
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QCoreApplication, QEvent, QThread
+
+# Stand-in for ffmpeg, driven by SOAK_FFMPEG_MODE at spawn time:
+#   run   - report progress until terminated
+#   exit  - report a few progress blocks and exit normally (end of input)
+#   crash - die with SIGSEGV right away
+#   hang  - report progress once, then freeze (stuck network read / frozen socket)
+FAKE_FFMPEG = r"""#!/bin/sh
+echo "Input #0, soak, from 'fake':" >&2
+echo "Output #0, flv, to 'fake':" >&2
+case "$SOAK_FFMPEG_MODE" in
+    exit)
+        for frame in 1 2 3; do
+            printf 'frame=%s\ntotal_size=%s00\nout_time_us=%s000000\nprogress=continue\n' $frame $frame $frame
+        done
+        printf 'progress=end\n'
+        exit 0 ;;
+    crash)
+        kill -SEGV $$ ;;
+    hang)
+        printf 'frame=1\ntotal_size=100\nout_time_us=1000000\nprogress=continue\n'
+        exec sleep 3600 ;;
+    *)
+        frame=0
+        while :; do
+            frame=$((frame + 1))
+            printf 'frame=%s\ntotal_size=%s00\nout_time_us=%s000000\nprogress=continue\n' $frame $frame $frame
+            sleep 0.2
+        done ;;
+esac
+"""
+
+
+class FakeYoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL; FakeYoutubeDL.mode = "ok" or "error"."""
+    mode = "ok"
+
+    def __init__(self, opts=None):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False):
+        if FakeYoutubeDL.mode == "error":
+            raise RuntimeError("simulated extraction failure")
+        return {
+            "id": "soak",
+            "formats": [
+                {"format_id": "136", "vcodec": "avc1", "acodec": "none", "height": 720, "url": "http://fake/v"},
+                {"format_id": "140", "vcodec": "none", "acodec": "mp4a", "abr": 128, "url": "http://fake/a"},
+            ],
+        }
+
+
+def process_stats() -> dict:
+    """RSS (KiB), threads do sistema e descritores abertos do processo atual."""
+    stats = {}
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                stats["rss_kb"] = int(line.split()[1])
+            elif line.startswith("Threads:"):
+                stats["threads"] = int(line.split()[1])
+    stats["fds"] = len(os.listdir("/proc/self/fd"))
+    return stats
+
+
+class SoakHarness:
+    def __init__(self, window, source: str, timeout: float):
+        self.window = window
+        self.source = source
+        self.timeout = timeout
+        self.failures = []
+        self.loops = 0
+
+    def on_log_message(self, message):
+        if message == "Re-looping YouTube stream...":
+            self.loops += 1
+
+    def pump(self):
+        QCoreApplication.processEvents()
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+    def wait_until(self, predicate, timeout=None) -> bool:
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while time.monotonic() < deadline:
+            self.pump()
+            if predicate():
+                return True
+            QThread.msleep(2)
+        return False
+
+    def idle(self) -> bool:
+        return self.window.stream_thread is None and self.window.start_button.isEnabled()
+
+    def start(self, ffmpeg_mode: str, youtube: bool = False, loop_mode: str = "Play Once"):
+        os.environ["SOAK_FFMPEG_MODE"] = ffmpeg_mode
+        if youtube:
+            self.window.video_path_input.clear()
+            self.window.youtube_url_input.setText("https://www.youtube.com/watch?v=soak")
+        else:
+            self.window.youtube_url_input.clear()
+            self.window.video_path_input.setText(self.source)
+        self.window.loop_mode_select.setCurrentText(loop_mode)
+        self.window.start_streaming()
+
+    def stop(self):
+        self.window.stop_streaming()
+
+    def expect(self, ok: bool, cycle: int, kind: str, what: str):
+        if not ok:
+            self.failures.append(f"cycle {cycle} ({kind}): {what}")
+
+    def run_cycle(self, cycle: int, kind: str):
+        window = self.window
+        FakeYoutubeDL.mode = "ok"
+        if kind == "start_stop":
+            self.start("run")
+            self.expect(self.wait_until(lambda: window.stop_button.isEnabled()), cycle, kind, "stream never started")
+            self.stop()
+        elif kind == "youtube_loop":
+            self.loops = 0
+            self.start("exit", youtube=True, loop_mode="Loop Infinitely")
+            self.expect(self.wait_until(lambda: self.loops >= 3), cycle, kind, "YouTube stream did not re-loop")
+            self.stop()
+        elif kind == "crash":
+            self.start("crash")
+        elif kind == "extract_error":
+            FakeYoutubeDL.mode = "error"
+            self.start("run", youtube=True)
+        elif kind == "hang":
+            stalls = sum(window.config["stall_counts"]["sources"].values())
+            self.start("hang")
+            self.expect(self.wait_until(lambda: sum(window.config["stall_counts"]["sources"].values()) > stalls),
+                        cycle, kind, "watchdog did not detect the stall")
+            self.stop()
+        # The stop button is only enabled once ffmpeg is up; stop again if
+        # the first stop raced with a restart or a re-loop
+        if not self.wait_until(self.idle, 5):
+            self.stop()
+        self.expect(self.wait_until(self.idle), cycle, kind, "stream did not shut down")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless soak/leak test for the TeleStream stream lifecycle (Linux only).")
+    parser.add_argument("--cycles", type=int, default=2000, help="Number of start/stop/loop/error cycles.")
+    parser.add_argument("--warmup", type=int, default=100, help="Cycles run before the baseline is taken.")
+    parser.add_argument("--hang-every", type=int, default=50, help="Run a watchdog (hang) cycle every N cycles; 0 disables.")
+    parser.add_argument("--rss-tolerance-mb", type=float, default=16, help="Allowed RSS growth after warm-up.")
+    parser.add_argument("--thread-tolerance", type=int, default=2, help="Allowed growth in OS thread count.")
+    parser.add_argument("--fd-tolerance", type=int, default=4, help="Allowed growth in open file descriptors.")
+    parser.add_argument("--timeout", type=float, default=15, help="Seconds to wait for each lifecycle step.")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="telestream-soak-")
+    # Caches (~/.cache/telestream) and the CPU slot registry stay in the
+    # scratch directory instead of touching the real ones; set before the
+    # app modules compute their default paths
+    for variable, name in (("HOME", "home"), ("XDG_RUNTIME_DIR", "runtime")):
+        os.environ[variable] = os.path.join(work_dir, name)
+        os.makedirs(os.environ[variable], mode=0o700)
+    fake_bin = os.path.join(work_dir, "bin")
+    os.makedirs(fake_bin)
+    fake_ffmpeg = os.path.join(fake_bin, "ffmpeg")
+    with open(fake_ffmpeg, "w") as f:
+        f.write(FAKE_FFMPEG)
+    os.chmod(fake_ffmpeg, os.stat(fake_ffmpeg).st_mode | stat.S_IEXEC)
+    os.environ["PATH"] = fake_bin + os.pathsep + os.environ.get("PATH", "")
+    source = os.path.join(work_dir, "source.mp4")
+    open(source, "wb").close()
+
+    # config.json and saved traces land in the scratch directory
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(work_dir)
+
+    app = QApplication(sys.argv)
+    import youtube
+    youtube.yt_dlp.YoutubeDL = FakeYoutubeDL
+    from main_window import MainWindow
+
+    window = MainWindow()
+    harness = SoakHarness(window, source, args.timeout)
+    original_log_message = window.log_message
+
+    def log_message(message):
+        original_log_message(message)
+        harness.on_log_message(message)
+    window.log_message = log_message
+
+    window.server_url_input.setText("rtmp://soak.invalid/live")
+    window.stream_key_input.setText("soak-key")
+    window.watchdog_checkbox.setChecked(True)
+    window.watchdog_timeout_spin.setMinimum(1)
+    window.watchdog_timeout_spin.setValue(1)
+
+    kinds = ["start_stop", "youtube_loop", "crash", "extract_error"]
+
+    baseline = None
+    started = time.monotonic()
+    for cycle in range(1, args.cycles + 1):
+        kind = kinds[cycle % len(kinds)]
+        if args.hang_every and cycle % args.hang_every == 0:
+            kind = "hang"
+        harness.run_cycle(cycle, kind)
+        if cycle == args.warmup:
+            gc.collect()
+            harness.pump()
+            baseline = process_stats()
+            print(f"baseline after {cycle} cycles: {baseline}")
+        elif cycle % 100 == 0:
+            print(f"cycle {cycle}/{args.cycles} ({time.monotonic() - started:.0f}s): {process_stats()}")
+        if len(harness.failures) > 20:
+            break
+
+    gc.collect()
+    harness.pump()
+    final = process_stats()
+    print(f"final after {cycle} cycles: {final}")
+    print(f"log lines kept: {len(window.log_history)}")
+
+    if baseline:
+        if final["rss_kb"] - baseline["rss_kb"] > args.rss_tolerance_mb * 1024:
+            harness.failures.append(f"RSS grew by {(final['rss_kb'] - baseline['rss_kb']) / 1024:.1f} MB")
+        if final["threads"] - baseline["threads"] > args.thread_tolerance:
+            harness.failures.append(f"thread count grew from {baseline['threads']} to {final['threads']}")
+        if final["fds"] - baseline["fds"] > args.fd_tolerance:
+            harness.failures.append(f"open file descriptors grew from {baseline['fds']} to {final['fds']}")
+
+    window.close()
+    if harness.failures:
+        print("SOAK FAILED:")
+        for failure in harness.failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("SOAK PASSED")
+
+
+if __name__ == "__main__":
+    main()
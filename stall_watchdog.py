@@ -0,0 +1,93 @@
+import time
+
+DEFAULT_WATCHDOG = {
+    "enabled": True,
+    "stall_seconds": 20
+}
+
+# Delay before relaunching a stalled pipeline; doubled on each consecutive
+# restart up to MAX_RESTART_DELAY_MS
+RESTART_DELAY_MS = 2000
+MAX_RESTART_DELAY_MS = 60 * 1000
+# The watchdog gives up after this many restarts in a row...
+MAX_CONSECUTIVE_RESTARTS = 5
+# ...unless the pipeline ran this long with output advancing in between
+HEALTHY_RESET_SECONDS = 60
+# ffmpeg reports no progress while probing the input and connecting to the
+# server; slow starts get this long before the first report
+STARTUP_SECONDS = 120
+
+
+def restart_delay_ms(attempt: int) -> int:
+    """Espera antes da tentativa de reinício número attempt (1, 2, ...)."""
+    return min(RESTART_DELAY_MS * 2 ** (attempt - 1), MAX_RESTART_DELAY_MS)
+
+
+class ProgressParser:
+    """Lê a saída de "-progress pipe:1" do ffmpeg.
+
+    O ffmpeg escreve blocos de linhas "chave=valor" terminados por
+    "progress=continue" (ou "progress=end"); feed() retorna os blocos
+    completos recebidos até o momento.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.current = {}
+
+    def feed(self, text: str) -> list:
+        self.buffer += text
+        lines = self.buffer.split("\n")
+        self.buffer = lines.pop()
+        blocks = []
+        for line in lines:
+            key, sep, value = line.strip().partition("=")
+            if not sep:
+                continue
+            self.current[key] = value
+            if key == "progress":
+                blocks.append(self.current)
+                self.current = {}
+        return blocks
+
+
+class StallDetector:
+    """Detecta quando frames e bytes de saída param de avançar.
+
+    O prazo normal só vale a partir do primeiro bloco de progresso; antes
+    dele (sondagem da entrada, conexão RTMP) o limite é startup_seconds.
+    """
+
+    def __init__(self, stall_seconds: float, startup_seconds: float = STARTUP_SECONDS):
+        self.stall_seconds = stall_seconds
+        self.startup_seconds = max(startup_seconds, stall_seconds)
+        self.last_position = None
+        self.armed_at = None
+        self.last_advance = time.monotonic()
+
+    @property
+    def armed(self) -> bool:
+        return self.armed_at is not None
+
+    def update(self, block: dict) -> bool:
+        """Registra um bloco de progresso. Retorna True se houve avanço."""
+        if not self.armed:
+            self.armed_at = time.monotonic()
+        position = (block.get("frame"), block.get("total_size"))
+        if position != self.last_position:
+            self.last_position = position
+            self.last_advance = time.monotonic()
+            return True
+        return False
+
+    def stalled_for(self) -> float:
+        return time.monotonic() - self.last_advance
+
+    def healthy_for(self) -> float:
+        """Há quanto tempo a saída avança sem travar (0 antes do primeiro bloco)."""
+        if not self.armed or self.is_stalled():
+            return 0
+        return time.monotonic() - self.armed_at
+
+    def is_stalled(self) -> bool:
+        return self.stalled_for() > (self.stall_seconds if self.armed else self.startup_seconds)
@@ -1,134 +1,550 @@
 
-import yt_dlp
-from PyQt6.QtCore import QObject, pyqtSignal, QProcess
+import os
+import time
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QProcess, QTimer
+import archive
+import cpu_budget
+import presets
+import renditions
+import overlays as overlay_filters
+import preview as preview_frames
+import resume
+import stall_watchdog
+import tracing
+import youtube
+from media_library import format_duration
 
 class Streamer(QObject):
     log_message = pyqtSignal(str)
     stream_started = pyqtSignal()
     stream_stopped = pyqtSignal()
+    stall_detected = pyqtSignal(str, str)
+    trace_finished = pyqtSignal(object)
+    # (checkpoint key, position in seconds); None clears the saved position
+    position_checkpoint = pyqtSignal(str, object)
 
     def __init__(self):
         super().__init__()
         self.streaming_process = None
+        self.cpu_slot = None
+        self.cpu_budget = None
+        self.archive_config = None
+        self.housekeeping_timer = None
+        self.rendition_count = 1
+        self.started_at = None
+        self.benchmark_process = None
+        self.benchmark_queue = []
+        self.benchmark_running = None
+        self.resolved_budget = None
+        self.shared_cpu_per_second = None
+        self.stream_args = None
+        self.progress_parser = None
+        self.stall_detector = None
+        self.watchdog_timer = None
+        self.restart_pending = False
+        self.restart_timer = None
+        self.restart_count = 0
+        self.gave_up = False
+        self.user_stopped = False
+        self.trace = None
+        self.trace_markers = set()
+        self.resume_key = None
+        self.position = 0
+        self.seek_offset = 0
+        self.reached_end = False
+        self.last_checkpoint = 0
 
-    def start_streaming(self, stream_source: str, server_url: str, stream_key: str, is_rpi: bool = False, loop_mode: str = "Loop Infinitely", quality_preset: str = "Source Quality", is_live_story: bool = False):
+    # Handlers connected from inside the stream thread are declared as Qt
+    # slots: undecorated methods get a PyQt proxy object in that thread,
+    # which is never freed once the thread has exited
+    @pyqtSlot()
+    def run(self):
+        self.start_streaming(**self.stream_args)
+
+    def start_streaming(self, stream_source: str, server_url: str, stream_key: str, is_rpi: bool = False, loop_mode: str = "Loop Infinitely", quality_preset: str = "Source Quality", is_live_story: bool = False, cpu_budget_config: dict = None, youtube_cache=None, archive_config: dict = None, extra_outputs: list = None, watchdog_config: dict = None, overlays: list = None, resolved_source: dict = None, start_position: float = 0, preview: dict = None, trace=None):
+        # Kept so the watchdog can relaunch the same pipeline
+        self.stream_args = {
+            "stream_source": stream_source, "server_url": server_url, "stream_key": stream_key,
+            "is_rpi": is_rpi, "loop_mode": loop_mode, "quality_preset": quality_preset,
+            "is_live_story": is_live_story, "cpu_budget_config": cpu_budget_config,
+            "youtube_cache": youtube_cache, "archive_config": archive_config,
+            "extra_outputs": extra_outputs, "watchdog_config": watchdog_config,
+            "overlays": overlays, "resolved_source": resolved_source,
+            "start_position": start_position, "preview": preview,
+        }
+        self.trace = trace or tracing.StartupTrace()
+        self.trace.end("thread_start")
+        self.trace_markers = set()
         self.log_message.emit("Starting stream...")
 
         input_source = stream_source
+        audio_source = None
         is_local_file = not stream_source.startswith("http")
 
         if not is_local_file:
-            try:
-                self.log_message.emit("Fetching YouTube stream URL...")
-                ydl_opts = {
-                    'format': 'best[ext=mp4]/best',
-                    'quiet': True
-                }
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(stream_source, download=False)
-                    input_source = info['url']
-                self.log_message.emit("Successfully fetched stream URL.")
-            except Exception as e:
-                self.log_message.emit(f"[ERROR] Failed to get YouTube stream URL: {e}")
-                self.stream_stopped.emit()
-                return
+            target_height = presets.source_target_height(
+                [quality_preset] + [extra["quality_preset"] for extra in extra_outputs or []], is_live_story)
+            use_cache = youtube_cache and loop_mode == "Loop Infinitely"
+            # The video ID comes from the URL itself, so a cached copy still
+            # plays when yt-dlp extraction is what is failing
+            video_id = youtube.video_id(stream_source) if use_cache else None
+            cached_path = youtube_cache.lookup(video_id, target_height) if video_id else None
+            if not cached_path:
+                try:
+                    if resolved_source:
+                        self.log_message.emit("Using the YouTube stream URL resolved ahead of time.")
+                        resolved = resolved_source
+                    else:
+                        self.log_message.emit("Fetching YouTube stream URL...")
+                        with self.trace.span("yt_dlp_extract"):
+                            resolved = youtube.resolve_stream(stream_source, target_height)
+                    input_source = resolved["video_url"]
+                    audio_source = resolved["audio_url"]
+                    self.log_message.emit(f"Successfully fetched stream URL: {resolved['description']}.")
+                    if use_cache:
+                        cached_path = youtube_cache.lookup(resolved["video_id"], target_height)
+                        if not cached_path:
+                            youtube_cache.prefetch(stream_source, resolved["video_id"], target_height, resolved["format_key"])
+                except Exception as e:
+                    self.log_message.emit(f"[ERROR] Failed to get YouTube stream URL: {e}")
+                    self.finish_trace("failed")
+                    self.stream_stopped.emit()
+                    return
+            if cached_path:
+                self.log_message.emit(f"Looping from cached copy: {cached_path}")
+                input_source = cached_path
+                audio_source = None
+                is_local_file = True
 
+        self.trace.begin("build_command")
         full_rtmp_url = f"{server_url}/{stream_key}"
         
         vcodec = "h264_v4l2m2m" if is_rpi else "libx264"
         
+        self.cpu_budget = cpu_budget_config
+        self.cpu_slot = cpu_budget.acquire_slot(bool((cpu_budget_config or {}).get("auto")))
+        resolved_budget = self.resolved_budget = cpu_budget.resolve_budget(cpu_budget_config, self.cpu_slot)
+        global_thread_args, output_thread_args = cpu_budget.ffmpeg_thread_args(resolved_budget)
+
         command = [
             "ffmpeg",
+            "-progress", "pipe:1",
         ]
+        command.extend(global_thread_args)
 
         if is_local_file and loop_mode == "Loop Infinitely":
             command.extend(["-stream_loop", "-1"])
 
+        # Only a single pass over a local file has a position to come back to
+        self.resume_key = None
+        if is_local_file and loop_mode == "Play Once":
+            try:
+                self.resume_key = resume.checkpoint_key(input_source)
+            except OSError:
+                pass
+        if not self.resume_key:
+            start_position = 0
+        self.position = self.seek_offset = start_position
+        self.reached_end = False
+        self.last_checkpoint = time.monotonic()
+        if start_position:
+            self.log_message.emit(f"Resuming at {format_duration(start_position)}.")
+            command.extend(resume.seek_args(start_position))
+
         command.extend(["-i", input_source])
+        if audio_source:
+            command.extend(["-i", audio_source])
+        overlay_input = 2 if audio_source else 1
+        command.extend(overlay_filters.input_args(overlays or []))
+
+        outputs = [{"name": "primary", "url": full_rtmp_url, "quality_preset": quality_preset}]
+        for extra in extra_outputs or []:
+            outputs.append({
+                "name": extra["name"],
+                "url": f"{extra['server_url']}/{extra['stream_key']}",
+                "quality_preset": extra["quality_preset"],
+            })
+        output_presets = [output["quality_preset"] for output in outputs]
+
+        # One decode and one shared filter graph feed every rendition
+        if preview and not preview_frames.supports_atomic_writing():
+            self.log_message.emit("[WARNING] This ffmpeg cannot write the preview atomically (image2 atomic_writing); live preview disabled.")
+            preview = None
+        preview_filter = preview_frames.preview_filter(preview["interval_seconds"]) if preview else None
+        filter_complex, video_labels = renditions.build_video_graph(output_presets, is_live_story, overlays, overlay_input, preview_filter)
+        if filter_complex:
+            command.extend(["-filter_complex", filter_complex])
+        audio_map = "1:a:0" if audio_source else "0:a:0?"
+
+        archive_enabled = bool(archive_config and archive_config.get("enabled"))
+        if archive_enabled:
+            archive_dir = archive_config["directory"] or archive.DEFAULT_ARCHIVE_DIR
+            try:
+                os.makedirs(archive_dir, exist_ok=True)
+            except OSError as e:
+                self.log_message.emit(f"[ERROR] Failed to create archive directory: {e}")
+                self.release_cpu_slot()
+                self.finish_trace("failed")
+                self.stream_stopped.emit()
+                return
+            self.archive_config = {**archive_config, "directory": archive_dir}
 
-        if is_live_story:
-            # 9:16 Live Story filter
-            quality_params_story = {
-                "1080p (5 Mbps)": {"res": "1080x1920", "bitrate": "5M"},
-                "720p (3 Mbps)": {"res": "720x1280", "bitrate": "3M"},
-                "480p (1.5 Mbps)": {"res": "480x854", "bitrate": "1.5M"},
-            }
-            
-            # Default to 1080p if "Source Quality" or other is selected
-            preset = quality_params_story.get(quality_preset, quality_params_story["1080p (5 Mbps)"])
-            res = preset["res"]
-            width, height = map(int, res.split('x'))
-            bitrate = preset["bitrate"]
-            
-            video_filter = (
-                f"[0:v]split=2[original][bg]; "
-                f"[bg]scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},boxblur=20[blurred_bg]; "
-                f"[original]scale={width}:{height}:force_original_aspect_ratio=decrease[fg]; "
-                f"[blurred_bg][fg]overlay=(W-w)/2:(H-h)/2"
-            )
+        for index, (output, video_label) in enumerate(zip(outputs, video_labels)):
             command.extend([
-                "-vf", video_filter,
+                "-map", video_label,
+                "-map", audio_map,
                 "-vcodec", vcodec,
                 "-r", "30",
                 "-g", "60",
-                "-b:v", bitrate,
-                "-preset", "veryfast",
             ])
-        else:
-            # Standard quality presets
+            if is_live_story:
+                command.extend(["-b:v", presets.story_preset(output["quality_preset"])["bitrate"], "-preset", "veryfast"])
+            elif output["quality_preset"] in presets.QUALITY_PRESETS:
+                command.extend(["-b:v", presets.QUALITY_PRESETS[output["quality_preset"]]["bitrate"]])
+            command.extend(output_thread_args)
             command.extend([
-                "-vcodec", vcodec,
-                "-r", "30",
-                "-g", "60",
+                "-acodec", "aac",
+                "-b:a", "128k",
             ])
 
-            quality_params = {
-                "1080p (5 Mbps)": ["-s", "1920x1080", "-b:v", "5M"],
-                "720p (3 Mbps)": ["-s", "1280x720", "-b:v", "3M"],
-                "480p (1.5 Mbps)": ["-s", "854x480", "-b:v", "1.5M"],
-            }
+            if index == 0 and archive_enabled:
+                command.extend([
+                    "-flags", "+global_header",
+                    "-f", "tee",
+                    archive.tee_output(output["url"], archive_dir, archive_config["segment_minutes"]),
+                ])
+                self.log_message.emit(f"Archiving to {archive_dir} in {archive_config['segment_minutes']}-minute segments.")
+            else:
+                command.extend([
+                    "-f", "flv",
+                    output["url"],
+                ])
+            if index > 0:
+                self.log_message.emit(f"Simulcasting {output['quality_preset']} to {output['name']}.")
 
-            if quality_preset in quality_params:
-                command.extend(quality_params[quality_preset])
+        if preview:
+            command.extend(preview_frames.output_args(preview["path"]))
 
-        command.extend([
-            "-acodec", "aac",
-            "-b:a", "128k",
-            "-f", "flv",
-            full_rtmp_url,
-        ])
-
-        self.streaming_process = QProcess()
-        self.streaming_process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self.streaming_process = QProcess(self)
+        # stdout carries -progress reports, stderr the regular ffmpeg log
+        self.streaming_process.setProcessChannelMode(QProcess.ProcessChannelMode.SeparateChannels)
+        self.progress_parser = stall_watchdog.ProgressParser()
         
         self.streaming_process.readyReadStandardOutput.connect(self.handle_stdout)
+        self.streaming_process.readyReadStandardError.connect(self.handle_stderr)
         self.streaming_process.finished.connect(self.handle_finished)
         self.streaming_process.errorOccurred.connect(self.handle_error)
 
+        self.trace.end("build_command")
+        self.trace.begin("ffmpeg_spawn")
         self.streaming_process.start("ffmpeg", command[1:])
         
         if self.streaming_process.waitForStarted():
-            self.log_message.emit(f"Streaming started with PID: {self.streaming_process.processId()}")
+            self.trace.end("ffmpeg_spawn")
+            self.trace.begin("input_probe")
+            pid = self.streaming_process.processId()
+            self.log_message.emit(f"Streaming started with PID: {pid}")
+            cpu_budget.register_pid(self.cpu_slot, pid)
+            for message in cpu_budget.apply_to_process(pid, resolved_budget):
+                self.log_message.emit(message)
+            for message in cpu_budget.rebalance(self.cpu_budget):
+                self.log_message.emit(message)
+            self.started_at = time.monotonic()
+            self.rendition_count = len(outputs)
+            if self.rendition_count > 1:
+                self.queue_benchmark(stream_source, input_source, renditions.shared_stage_graph(output_presets, is_live_story),
+                                     [], self.handle_shared_stage_benchmark)
+            if overlays:
+                self.start_overlay_benchmark(stream_source, input_source, output_presets, is_live_story, overlays)
+            if self.archive_config:
+                self.prune_archive()
+            self.housekeeping_timer = QTimer(self)
+            self.housekeeping_timer.timeout.connect(self.housekeeping)
+            self.housekeeping_timer.start(60 * 1000)
+            watchdog_config = {**stall_watchdog.DEFAULT_WATCHDOG, **(watchdog_config or {})}
+            if watchdog_config["enabled"]:
+                self.stall_detector = stall_watchdog.StallDetector(watchdog_config["stall_seconds"])
+                self.watchdog_timer = QTimer(self)
+                self.watchdog_timer.timeout.connect(self.check_stall)
+                self.watchdog_timer.start(1000)
             self.stream_started.emit()
         else:
             self.log_message.emit("[ERROR] Failed to start ffmpeg. Check if it's installed and in PATH.")
+            if self.streaming_process is None:
+                # Already cleaned up by handle_error (FailedToStart)
+                return
+            self.release_cpu_slot()
+            self.finish_trace("failed")
             self.stream_stopped.emit()
+            self.streaming_process.deleteLater()
+            self.streaming_process = None
 
+    @pyqtSlot()
     def handle_stdout(self):
         data = self.streaming_process.readAllStandardOutput()
+        for block in self.progress_parser.feed(data.data().decode('utf-8', errors='replace')):
+            if self.stall_detector:
+                self.stall_detector.update(block)
+            if self.resume_key:
+                self.update_position(block)
+            if not self.trace.finished and block.get("frame", "0") != "0" and block.get("total_size", "0") not in ("0", "N/A"):
+                # Only spans cut short by a failure or abort are left open for finish()
+                self.trace.end("first_keyframe")
+                self.finish_trace("first_packet")
+
+    def update_position(self, block: dict):
+        position = resume.progress_position(block, self.seek_offset)
+        if position is not None:
+            self.position = position
+        if block.get("progress") == "end":
+            self.reached_end = True
+        elif time.monotonic() - self.last_checkpoint >= resume.CHECKPOINT_SECONDS:
+            self.last_checkpoint = time.monotonic()
+            self.position_checkpoint.emit(self.resume_key, self.position)
+
+    def save_position(self, completed: bool):
+        """Apaga a posição salva se o arquivo chegou ao fim (ou o usuário
+        parou), senão salva até onde a reprodução chegou."""
+        if not self.resume_key:
+            return
+        self.position_checkpoint.emit(self.resume_key, None if completed else self.position)
+
+    def mark_trace(self, message: str):
+        # ffmpeg prints the input dump after probing and the output dump once
+        # the RTMP connection is up and the encoders are initialized
+        if "Input #0" in message and "input" not in self.trace_markers:
+            self.trace_markers.add("input")
+            self.trace.end("input_probe")
+            self.trace.begin("rtmp_connect_and_encoder_init")
+        if "Output #0" in message and "output" not in self.trace_markers:
+            self.trace_markers.add("output")
+            self.trace.end("rtmp_connect_and_encoder_init")
+            self.trace.begin("first_keyframe")
+
+    def finish_trace(self, outcome: str):
+        if not self.trace or self.trace.finished:
+            return
+        self.trace.finish(outcome)
+        self.log_message.emit(self.trace.summary() + ("" if outcome == "first_packet" else f" [{outcome}]"))
+        self.trace_finished.emit(self.trace)
+
+    @pyqtSlot()
+    def check_stall(self):
+        if not self.stall_detector:
+            return
+        if self.restart_count and self.stall_detector.healthy_for() > stall_watchdog.HEALTHY_RESET_SECONDS:
+            self.restart_count = 0
+        if not self.stall_detector.is_stalled():
+            return
+        self.stop_watchdog()
+        source = self.stream_args["stream_source"]
+        server_url = self.stream_args["server_url"]
+        if self.stall_detector.armed:
+            self.log_message.emit(f"[WARNING] No output progress for {self.stall_detector.stalled_for():.0f}s.")
+        else:
+            self.log_message.emit(f"[WARNING] ffmpeg produced no output within {self.stall_detector.stalled_for():.0f}s of starting.")
+        self.stall_detected.emit(source, server_url)
+        if self.restart_count >= stall_watchdog.MAX_CONSECUTIVE_RESTARTS:
+            self.log_message.emit(f"[ERROR] Giving up after {self.restart_count} restarts in a row; stopping the stream.")
+            self.gave_up = True
+        else:
+            self.log_message.emit("Restarting the pipeline.")
+            self.restart_pending = True
+        self.streaming_process.kill()
+
+    @pyqtSlot()
+    def restart_pipeline(self):
+        self.restart_pending = False
+        self.cancel_restart_timer()
+        if self.user_stopped:
+            self.save_position(True)
+            self.stream_stopped.emit()
+            return
+        self.log_message.emit("Restarting stream after stall...")
+        # A URL resolved ahead of time may have expired by now
+        self.start_streaming(**{**self.stream_args, "resolved_source": None,
+                                "start_position": resume.resume_position(self.position),
+                                "trace": tracing.StartupTrace("restart")})
+
+    def cancel_restart_timer(self):
+        if self.restart_timer:
+            self.restart_timer.stop()
+            self.restart_timer.deleteLater()
+            self.restart_timer = None
+
+    def stop_watchdog(self):
+        if self.watchdog_timer:
+            self.watchdog_timer.stop()
+            self.watchdog_timer = None
+
+    @pyqtSlot()
+    def handle_stderr(self):
+        data = self.streaming_process.readAllStandardError()
         try:
             message = data.data().decode('utf-8', errors='replace').strip()
             if message:
+                if not self.trace.finished:
+                    self.mark_trace(message)
                 self.log_message.emit(message)
         except Exception:
             # This can happen if there are decoding issues with partial data
             pass
 
+    def release_cpu_slot(self):
+        if self.cpu_slot is not None:
+            cpu_budget.release_slot(self.cpu_slot)
+            self.cpu_slot = None
+            for message in cpu_budget.rebalance(self.cpu_budget):
+                self.log_message.emit(message)
+
+    def prune_archive(self):
+        for path in archive.prune(self.archive_config["directory"], self.archive_config["quota_gb"]):
+            self.log_message.emit(f"Archive quota reached, deleted {os.path.basename(path)}.")
+
+    def queue_benchmark(self, source_key: str, input_source: str, filter_graph: str, extra_inputs: list, handler):
+        # Keyed by the source as the user gave it: resolved YouTube URLs
+        # change on every extraction
+        key = (source_key, filter_graph, tuple(extra_inputs))
+        if key in renditions.benchmark_results:
+            handler(renditions.benchmark_results[key])
+            return
+        pending = [self.benchmark_running] if self.benchmark_running else []
+        for entry in pending + self.benchmark_queue:
+            if entry["key"] == key:
+                entry["handlers"].append(handler)
+                return
+        # Benchmarks run one at a time so they don't skew each other
+        self.benchmark_queue.append({
+            "key": key,
+            "args": renditions.benchmark_args(input_source, filter_graph, extra_inputs),
+            "handlers": [handler],
+        })
+        if not self.benchmark_process:
+            self.start_next_benchmark()
+
+    def start_next_benchmark(self):
+        if not self.benchmark_queue:
+            return
+        self.benchmark_running = self.benchmark_queue.pop(0)
+        self.benchmark_process = QProcess(self)
+        self.benchmark_process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self.benchmark_process.finished.connect(self.handle_benchmark_finished)
+        self.benchmark_process.errorOccurred.connect(self.handle_benchmark_error)
+        self.benchmark_process.started.connect(self.handle_benchmark_started)
+        self.benchmark_process.start("ffmpeg", self.benchmark_running["args"])
+
+    @pyqtSlot()
+    def handle_benchmark_started(self):
+        # Same cores and priority as the stream it measures
+        if self.benchmark_process and self.resolved_budget:
+            cpu_budget.apply_to_process(self.benchmark_process.processId(), self.resolved_budget)
+
+    def finish_benchmark(self, cpu_seconds):
+        self.benchmark_process.deleteLater()
+        self.benchmark_process = None
+        finished, self.benchmark_running = self.benchmark_running, None
+        # Failures (network hiccup, ffmpeg missing) are retried on the next start
+        if cpu_seconds is not None:
+            renditions.benchmark_results[finished["key"]] = cpu_seconds
+        for handler in finished["handlers"]:
+            handler(cpu_seconds)
+        self.start_next_benchmark()
+
+    @pyqtSlot()
+    def handle_benchmark_finished(self):
+        output = self.benchmark_process.readAll().data().decode('utf-8', errors='replace')
+        self.finish_benchmark(renditions.parse_benchmark(output))
+
+    @pyqtSlot(QProcess.ProcessError)
+    def handle_benchmark_error(self, error: QProcess.ProcessError):
+        # A crash is followed by finished(); FailedToStart is not
+        if error != QProcess.ProcessError.FailedToStart:
+            return
+        self.log_message.emit("[WARNING] Failed to start the ffmpeg benchmark.")
+        self.benchmark_process.finished.disconnect()
+        self.finish_benchmark(None)
+
+    def handle_shared_stage_benchmark(self, cpu_seconds):
+        # What each separate instance would repeat: decode + first filter stage
+        if cpu_seconds is not None:
+            self.shared_cpu_per_second = cpu_seconds / renditions.BENCHMARK_SECONDS
+
+    def start_overlay_benchmark(self, source_key: str, input_source: str, output_presets: list, is_live_story: bool, overlays: list):
+        # Same first stage with and without the overlays, so the difference is the compositing cost
+        base_graph = renditions.shared_stage_graph(output_presets, is_live_story)
+        overlay_graph = renditions.shared_stage_graph(output_presets, is_live_story, overlays)
+        overlay_paths = [overlay["path"] for overlay in overlays]
+        if ((source_key, base_graph, ()) in renditions.benchmark_results
+                and (source_key, overlay_graph, tuple(overlay_paths)) in renditions.benchmark_results):
+            # Already measured and reported for this source and overlays
+            return
+        results = {}
+
+        def done(name, cpu_seconds):
+            results[name] = cpu_seconds
+            if len(results) == 2:
+                self.log_message.emit(overlay_filters.cost_report(results["base"], results["overlay"], renditions.BENCHMARK_SECONDS))
+
+        self.queue_benchmark(source_key, input_source, base_graph, [], lambda cpu_seconds: done("base", cpu_seconds))
+        self.queue_benchmark(source_key, input_source, overlay_graph, overlay_paths, lambda cpu_seconds: done("overlay", cpu_seconds))
+
+    def report_simulcast_cpu(self):
+        if self.rendition_count < 2 or not self.streaming_process or self.started_at is None:
+            return
+        cpu_seconds = renditions.process_cpu_seconds(self.streaming_process.processId())
+        if cpu_seconds is None:
+            return
+        wall_seconds = time.monotonic() - self.started_at
+        self.log_message.emit(renditions.cpu_report(self.rendition_count, cpu_seconds, wall_seconds, self.shared_cpu_per_second))
+
+    @pyqtSlot()
+    def housekeeping(self):
+        if self.archive_config:
+            self.prune_archive()
+        self.report_simulcast_cpu()
+
+    def stop_housekeeping(self):
+        if self.housekeeping_timer:
+            self.housekeeping_timer.stop()
+            self.housekeeping_timer = None
+        self.benchmark_queue = []
+        self.benchmark_running = None
+        if self.benchmark_process:
+            # Killed benchmarks have no result to report
+            self.benchmark_process.finished.disconnect()
+            self.benchmark_process.kill()
+            self.benchmark_process.waitForFinished(1000)
+            self.benchmark_process.deleteLater()
+            self.benchmark_process = None
+
+    @pyqtSlot()
     def handle_finished(self):
+        self.finish_trace("aborted")
+        self.release_cpu_slot()
+        self.stop_housekeeping()
+        self.stop_watchdog()
         self.log_message.emit("Stream process finished.")
+        if self.streaming_process:
+            completed = (self.reached_end and self.streaming_process.exitStatus() == QProcess.ExitStatus.NormalExit
+                         and self.streaming_process.exitCode() == 0)
+            self.save_position(completed or self.user_stopped)
+            self.streaming_process.deleteLater()
+            self.streaming_process = None
+        if self.restart_pending and not self.user_stopped:
+            self.restart_count += 1
+            delay = stall_watchdog.restart_delay_ms(self.restart_count)
+            if self.restart_count > 1:
+                self.log_message.emit(f"Restart {self.restart_count} in a row, waiting {delay / 1000:.0f}s.")
+            # Kept so stop_streaming can cancel the wait
+            self.restart_timer = QTimer(self)
+            self.restart_timer.setSingleShot(True)
+            self.restart_timer.timeout.connect(self.restart_pipeline)
+            self.restart_timer.start(delay)
+            return
+        self.restart_pending = False
         self.stream_stopped.emit()
-        self.streaming_process = None
 
+    @pyqtSlot(QProcess.ProcessError)
     def handle_error(self, error: QProcess.ProcessError):
         error_map = {
             QProcess.ProcessError.FailedToStart: "Failed to start",
@@ -138,17 +554,38 @@ class Streamer(QObject):
             QProcess.ProcessError.WriteError: "Write error",
             QProcess.ProcessError.UnknownError: "Unknown error",
         }
+        if self.restart_pending or self.gave_up:
+            # Killed by the watchdog; handle_finished relaunches or ends the stream
+            return
         self.log_message.emit(f"[ERROR] Process error: {error_map.get(error, 'Unknown error')}")
+        if error != QProcess.ProcessError.FailedToStart:
+            # A crash is followed by finished(); the other errors leave ffmpeg running
+            return
+        self.finish_trace("aborted")
+        self.release_cpu_slot()
+        self.stop_housekeeping()
+        self.stop_watchdog()
         self.stream_stopped.emit()
+        self.streaming_process.deleteLater()
         self.streaming_process = None
 
+    @pyqtSlot()
     def stop_streaming(self):
+        self.user_stopped = True
         if self.streaming_process and self.streaming_process.state() == QProcess.ProcessState.Running:
             self.log_message.emit("Stopping stream...")
+            self.report_simulcast_cpu()
             self.streaming_process.terminate()
             if not self.streaming_process.waitForFinished(5000):
                 self.log_message.emit("ffmpeg did not respond, forcing termination.")
                 self.streaming_process.kill()
             self.log_message.emit("Stream stopped.")
+        elif self.restart_pending:
+            # Waiting to restart after a stall: end the stream right away
+            self.cancel_restart_timer()
+            self.restart_pending = False
+            self.save_position(True)
+            self.log_message.emit("Stream stopped.")
+            self.stream_stopped.emit()
         else:
             self.log_message.emit("No active stream to stop.")
@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import datetime
+import threading
+
+TRACE_DIR = "traces"
+
+
+class StartupTrace:
+    """Registra spans temporizados da inicialização de um stream.
+
+    Os spans podem vir de threads diferentes (janela principal e thread do
+    streamer) e são exportados no formato JSON de trace do Chrome, que
+    também abre no Perfetto (https://ui.perfetto.dev).
+    """
+
+    def __init__(self, name: str = "stream_start"):
+        self.name = name
+        self.origin_ns = time.perf_counter_ns()
+        self.wall_start = datetime.datetime.now()
+        self.events = []
+        self.open_spans = {}
+        self.lock = threading.Lock()
+        self.finished = False
+
+    def _now_us(self) -> float:
+        return (time.perf_counter_ns() - self.origin_ns) / 1000
+
+    def begin(self, name: str):
+        with self.lock:
+            self.open_spans[name] = (self._now_us(), threading.get_ident())
+
+    def end(self, name: str, **args):
+        with self.lock:
+            if name not in self.open_spans:
+                return
+            start, tid = self.open_spans.pop(name)
+            self.events.append({
+                "name": name, "cat": "startup", "ph": "X",
+                "ts": start, "dur": self._now_us() - start,
+                "pid": os.getpid(), "tid": tid, "args": args,
+            })
+
+    def span(self, name: str):
+        return _Span(self, name)
+
+    def instant(self, name: str, **args):
+        with self.lock:
+            self.events.append({
+                "name": name, "cat": "startup", "ph": "i", "s": "p",
+                "ts": self._now_us(), "pid": os.getpid(),
+                "tid": threading.get_ident(), "args": args,
+            })
+
+    def finish(self, outcome: str = "first_packet"):
+        """Fecha spans pendentes e marca o fim do trace."""
+        with self.lock:
+            pending = list(self.open_spans)
+        for name in pending:
+            self.end(name, incomplete=True)
+        self.instant(outcome)
+        self.finished = True
+
+    def total_seconds(self) -> float:
+        return self._now_us() / 1e6 if not self.events else max(
+            event["ts"] + event.get("dur", 0) for event in self.events) / 1e6
+
+    def summary(self) -> str:
+        spans = sorted((e for e in self.events if e["ph"] == "X"), key=lambda e: e["ts"])
+        parts = ", ".join(f"{e['name']} {e['dur'] / 1e6:.2f}s" for e in spans)
+        return f"Startup trace: {self.total_seconds():.2f}s total ({parts})"
+
+    def to_chrome_trace(self) -> dict:
+        with self.lock:
+            events = list(self.events)
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"name": self.name, "started_at": self.wall_start.isoformat()},
+        }
+
+    def export(self, directory: str = TRACE_DIR) -> str:
+        os.makedirs(directory, exist_ok=True)
+        timestamp = self.wall_start.strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(directory, f"telestream_trace_{timestamp}_{self.name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, indent=1)
+        return path
+
+
+class _Span:
+    def __init__(self, trace: StartupTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.trace.begin(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc:
+            self.trace.end(self.name, error=repr(exc))
+        else:
+            self.trace.end(self.name)
+        return False
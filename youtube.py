@@ -0,0 +1,95 @@
+import re
+import yt_dlp
+
+VIDEO_ID_PATTERN = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|live/|embed/)|youtu\.be/)([A-Za-z0-9_-]{11})")
+
+# Cheaper codecs to decode come first
+CODEC_PREFERENCE = ("avc1", "vp9", "vp09", "av01")
+
+
+def _codec_rank(fmt: dict) -> int:
+    vcodec = fmt.get("vcodec") or ""
+    for rank, prefix in enumerate(CODEC_PREFERENCE):
+        if vcodec.startswith(prefix):
+            return rank
+    return len(CODEC_PREFERENCE)
+
+
+def _is_video_only(fmt: dict) -> bool:
+    return (fmt.get("vcodec") not in (None, "none") and fmt.get("acodec") == "none"
+            and bool(fmt.get("height")) and bool(fmt.get("url")))
+
+
+def _is_audio_only(fmt: dict) -> bool:
+    return (fmt.get("acodec") not in (None, "none") and fmt.get("vcodec") == "none"
+            and bool(fmt.get("url")))
+
+
+def select_formats(formats: list, target_height=None):
+    """Escolhe o menor vídeo adaptativo com altura >= target_height e o melhor áudio.
+
+    Sem target_height (Source Quality) escolhe o maior vídeo disponível.
+    Se nenhum vídeo atingir a altura alvo, usa o maior disponível.
+    Retorna (video_format, audio_format) ou (None, None) se não houver
+    formatos adaptativos.
+    """
+    videos = [f for f in formats if _is_video_only(f)]
+    audios = [f for f in formats if _is_audio_only(f)]
+    if not videos or not audios:
+        return None, None
+
+    def high_fps(fmt):
+        return (fmt.get("fps") or 30) > 30
+
+    candidates = [f for f in videos if target_height and f["height"] >= target_height]
+    if candidates:
+        video = min(candidates, key=lambda f: (f["height"], high_fps(f), _codec_rank(f), f.get("tbr") or 0))
+    else:
+        video = max(videos, key=lambda f: (f["height"], -_codec_rank(f), f.get("tbr") or 0))
+    audio = max(audios, key=lambda f: (f.get("abr") or f.get("tbr") or 0))
+    return video, audio
+
+
+def video_id(url: str):
+    """ID do vídeo lido da própria URL, sem consultar o YouTube; None se não reconhecido."""
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def resolve_stream(url: str, target_height=None) -> dict:
+    """Extrai as URLs de vídeo e áudio de um vídeo do YouTube.
+
+    Retorna um dicionário com "video_id", "video_url", "audio_url" (None
+    quando só existe um formato progressivo) e "description" para o log.
+    """
+    ydl_opts = {
+        'format': 'bv*+ba/b',
+        'quiet': True,
+        'noplaylist': True
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    video, audio = select_formats(info.get("formats") or [], target_height)
+    if video:
+        return {
+            "video_id": info.get("id"),
+            "video_url": video["url"],
+            "audio_url": audio["url"],
+            "format_key": f"{video['format_id']}+{audio['format_id']}",
+            "description": (f"{video['height']}p {video.get('vcodec')} video (format {video['format_id']}) "
+                            f"+ {audio.get('acodec')} audio (format {audio['format_id']})"),
+        }
+
+    # Only progressive formats available
+    progressive_url = info.get("url")
+    if not progressive_url:
+        raise ValueError("No playable format found.")
+    return {
+        "video_id": info.get("id"),
+        "video_url": progressive_url,
+        "audio_url": None,
+        "format_key": info.get("format_id"),
+        "description": f"progressive format {info.get('format_id')}",
+    }
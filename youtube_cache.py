@@ -0,0 +1,138 @@
+import os
+import glob
+import shutil
+import threading
+from pathlib import Path
+import yt_dlp
+from PyQt6.QtCore import QObject, pyqtSignal
+from cpu_budget import process_alive
+
+DEFAULT_CACHE_DIR = str(Path.home() / ".cache" / "telestream" / "youtube")
+
+# Downloads in progress go to ".partial-<pid>", one directory per instance
+PARTIAL_PREFIX = ".partial-"
+
+DEFAULT_YOUTUBE_CACHE = {
+    "enabled": False,
+    "directory": "",
+    "max_size_gb": 5
+}
+
+
+class YouTubeCache(QObject):
+    """Cache em disco de vídeos do YouTube, com limite de tamanho e remoção LRU.
+
+    Os arquivos são nomeados pelo ID do vídeo e pela altura pedida pelas
+    predefinições, então uma mudança de predefinição gera uma nova entrada
+    e uma cópia em cache pode ser achada sem consultar o YouTube.
+    """
+    log_message = pyqtSignal(str)
+
+    def __init__(self, directory: str = "", max_size_gb: float = 5):
+        super().__init__()
+        self.downloading = set()
+        self.lock = threading.Lock()
+        self.configure(directory, max_size_gb)
+        self.remove_stale_partials()
+
+    def configure(self, directory: str, max_size_gb: float):
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.max_bytes = int(max_size_gb * 1024 ** 3)
+        self.partial_dir = os.path.join(self.directory, f"{PARTIAL_PREFIX}{os.getpid()}")
+
+    def remove_stale_partials(self):
+        """Apaga downloads interrompidos de instâncias que já terminaram.
+
+        Os de outras instâncias em execução são mantidos; o desta só pode
+        ser de um processo anterior com o mesmo PID.
+        """
+        for path in glob.glob(os.path.join(glob.escape(self.directory), ".partial*")):
+            owner = os.path.basename(path)[len(PARTIAL_PREFIX):]
+            if (path.startswith(os.path.join(self.directory, PARTIAL_PREFIX)) and owner.isdigit()
+                    and int(owner) != os.getpid() and process_alive(int(owner))):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def cache_key(video_id: str, target_height) -> str:
+        return f"{video_id}_{target_height or 'source'}".replace(os.sep, "_")
+
+    def lookup(self, video_id: str, target_height):
+        """Retorna o caminho do arquivo em cache, ou None."""
+        key = self.cache_key(video_id, target_height)
+        for path in glob.glob(os.path.join(glob.escape(self.directory), f"{glob.escape(key)}.*")):
+            try:
+                # Mark as recently used for LRU eviction
+                os.utime(path)
+            except OSError:
+                continue
+            return path
+        return None
+
+    def prefetch(self, url: str, video_id: str, target_height, format_key: str):
+        """Inicia o download em segundo plano se o vídeo ainda não estiver em cache.
+
+        format_key são os formatos escolhidos na extração, baixados como
+        a entrada de (video_id, target_height).
+        """
+        key = self.cache_key(video_id, target_height)
+        with self.lock:
+            if key in self.downloading:
+                return
+            self.downloading.add(key)
+        if self.lookup(video_id, target_height):
+            with self.lock:
+                self.downloading.discard(key)
+            return
+        self.log_message.emit(f"Caching YouTube video {video_id} in the background...")
+        thread = threading.Thread(target=self._download, args=(url, format_key, key), daemon=True)
+        thread.start()
+
+    def _download(self, url: str, format_key: str, key: str):
+        os.makedirs(self.partial_dir, exist_ok=True)
+        ydl_opts = {
+            'format': format_key,
+            'quiet': True,
+            'noprogress': True,
+            'noplaylist': True,
+            'outtmpl': os.path.join(self.partial_dir, f"{key}.%(ext)s"),
+            'merge_output_format': 'mkv'
+        }
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=True)
+            downloaded = info["requested_downloads"][0]["filepath"]
+            size = os.path.getsize(downloaded)
+            if size > self.max_bytes:
+                os.remove(downloaded)
+                self.log_message.emit(f"[WARNING] YouTube video {info.get('id')} is larger than the cache limit; not cached.")
+                return
+            final_path = os.path.join(self.directory, key + os.path.splitext(downloaded)[1])
+            self.evict(size)
+            os.replace(downloaded, final_path)
+            self.log_message.emit(f"YouTube video cached ({size / 1024 ** 2:.1f} MB); the next loop will play from disk.")
+        except Exception as e:
+            self.log_message.emit(f"[WARNING] Failed to cache YouTube video: {e}")
+        finally:
+            with self.lock:
+                self.downloading.discard(key)
+
+    def evict(self, incoming_bytes: int = 0):
+        """Remove os arquivos menos usados até caber incoming_bytes no limite."""
+        entries = []
+        for path in glob.glob(os.path.join(glob.escape(self.directory), "*")):
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for __, size, __ in entries) + incoming_bytes
+        for __, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.log_message.emit(f"Evicted {os.path.basename(path)} from the YouTube cache.")
+            except OSError:
+                # Still open by a running ffmpeg (Windows)
+                continue